@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+'''
+  Title: RRI Batch Conversion Utilities
+Project: ePOP RRI to GNU Radio
+   Date: Oct 2026
+   Desc: Fans HDF5_SigMF_Converter work for a directory or glob of RRI
+         HDF5 files out over a process pool and summarizes the results.
+ Author: Zach Leffke, KJ4QLP
+'''
+import sys, os, copy
+import glob
+import json
+import time
+import functools
+import multiprocessing
+
+import hdf5_utils as utils
+import manifest_utils as mfst
+import profile_utils as profile
+
+
+def find_rri_files(src):
+    #src may be a directory (all *.h5 files in it) or a glob pattern
+    if os.path.isdir(src):
+        pattern = os.path.join(src, '*.h5')
+    else:
+        pattern = os.path.expanduser(src)
+    return sorted(glob.glob(pattern))
+
+def file_config(cfg, fp):
+    #Copy of cfg pointed at a single RRI file
+    cfg = copy.deepcopy(cfg)
+    fp = os.path.abspath(fp)
+    cfg['main']['rri_path'] = os.path.dirname(fp)
+    cfg['main']['rri_file'] = os.path.basename(fp)
+    return cfg
+
+def filter_current(cfg, files, manifest):
+    #Drop files whose SigMF outputs are already current in the manifest
+    todo = []
+    for fp in files:
+        fcfg = file_config(cfg, fp)
+        if manifest.is_current('sigmf', [fp], None,
+                               mfst.product_config(fcfg, 'sigmf')):
+            print("Current, skipping: {:s}".format(fp))
+        else:
+            todo.append(fp)
+    print("{:d} of {:d} files need conversion".format(len(todo), len(files)))
+    return todo
+
+def update_manifest(cfg, results, manifest):
+    #Record the successful conversions, done in the parent process so the
+    #workers never write the manifest concurrently
+    for res in results:
+        if res['status'] != 'ok':
+            continue
+        fcfg = file_config(cfg, res['file'])
+        manifest.update('sigmf', [res['file']], res['outputs'],
+                        mfst.product_config(fcfg, 'sigmf'))
+
+def convert_file(cfg, fp):
+    #Process pool worker, runs the full SigMF conversion of a single RRI file
+    #and returns a result record instead of raising
+    cfg = file_config(cfg, fp)
+    fp = os.path.abspath(fp)
+
+    result = {
+        'file'   : fp,
+        'bytes'  : os.path.getsize(fp) if os.path.exists(fp) else 0,
+        'status' : 'ok',
+        'error'  : None,
+        'elapsed': 0.0,
+        'profile': None,
+        'outputs': [],
+    }
+    t0 = time.perf_counter()
+    conv = None
+    try:
+        conv = utils.HDF5_SigMF_Converter(cfg)
+        conv.get_metadata()
+        conv.get_radio_iq()
+        conv.get_radio_meta()
+        result['outputs'] = conv.output_files()
+        result['profile'] = conv.get_profile()
+    except (Exception, SystemExit) as e:
+        result['status'] = 'failed'
+        result['error']  = repr(e)
+    finally:
+        if conv is not None and conv.h5_data is not None:
+            conv.h5_data.close()
+    result['elapsed'] = time.perf_counter() - t0
+    return result
+
+def run_batch(cfg, files, workers=1):
+    #Convert all files over a pool of worker processes, returns the per file
+    #results (in completion order) and the total wall time
+    workers = max(1, min(int(workers), len(files)))
+    if len(files) == 0:
+        return [], 0.0
+    worker = functools.partial(convert_file, cfg)
+    results = []
+    t0 = time.perf_counter()
+    if workers == 1:
+        for fp in files:
+            results.append(worker(fp))
+            _print_result(results[-1], len(results), len(files))
+    else:
+        with multiprocessing.Pool(processes=workers) as pool:
+            for res in pool.imap_unordered(worker, files):
+                results.append(res)
+                _print_result(res, len(results), len(files))
+    return results, time.perf_counter() - t0
+
+def _print_result(res, idx, total):
+    print("[{:d}/{:d}] {:6s} {:8.2f} s  {:s}".format(idx, total, res['status'].upper(),
+                                                    res['elapsed'], os.path.basename(res['file'])))
+    if res['error'] is not None:
+        print("    ERROR: {:s}".format(res['error']))
+
+def write_batch_profile(cfg, results):
+    #Aggregate the per file stage profiles of the successful conversions
+    reports = [r['profile'] for r in results if r['profile'] is not None]
+    if len(reports) == 0:
+        return None
+    fp = cfg['main']['profile']['batch_file']
+    if not os.path.isabs(fp):
+        fp = '/'.join([cfg['main']['rri_path'], fp])
+    agg = profile.aggregate_reports(reports)
+    agg['reports'] = reports
+    with open(fp, 'w') as f:
+        f.write(json.dumps(agg, indent=4))
+        f.close()
+    profile.print_report(agg)
+    print("Wrote Batch Stage Profile: {:s}".format(fp))
+    return fp
+
+def batch_summary(results, elapsed):
+    ok = [r for r in results if r['status'] == 'ok']
+    failed = [r for r in results if r['status'] != 'ok']
+    num_bytes = sum(r['bytes'] for r in ok)
+    summary = {
+        'files'       : len(results),
+        'succeeded'   : len(ok),
+        'failed'      : len(failed),
+        'bytes'       : num_bytes,
+        'elapsed'     : elapsed,
+        'mb_per_sec'  : num_bytes / elapsed / 1e6 if elapsed > 0 else 0.0,
+        'files_per_sec': len(ok) / elapsed if elapsed > 0 else 0.0,
+    }
+    return summary
+
+def print_batch_summary(results, elapsed):
+    summary = batch_summary(results, elapsed)
+    print("----------Batch Conversion Summary-----------------")
+    for res in sorted(results, key=lambda r: r['file']):
+        print("  {:6s} {:8.2f} s  {:s}".format(res['status'].upper(), res['elapsed'], res['file']))
+        if res['error'] is not None:
+            print("         {:s}".format(res['error']))
+    print("        Files: {:d} ({:d} ok, {:d} failed)".format(summary['files'],
+                                                             summary['succeeded'],
+                                                             summary['failed']))
+    print("   Input [MB]: {:.2f}".format(summary['bytes'] / 1e6))
+    print("Elapsed [sec]: {:.2f}".format(summary['elapsed']))
+    print("   Throughput: {:.2f} MB/s, {:.3f} files/s".format(summary['mb_per_sec'],
+                                                            summary['files_per_sec']))
+    return summary
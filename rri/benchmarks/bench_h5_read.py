@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+'''
+  Title: RRI HDF5 Read Benchmark
+Project: ePOP RRI to GNU Radio
+   Date: Oct 2026
+   Desc: Times reading the four RRI monopole datasets to float32, legacy
+         np.array(dataset[rows], dtype) against the converter's read_direct
+         into preallocated, chunk aligned buffers, for several block sizes,
+         chunk cache sizes and file drivers, from a cold and a warm OS page
+         cache.  Cold runs evict only the RRI file's pages unless
+         --drop_caches is given.
+  Input: Level 1 RRI Data, HDF5 Format (from config)
+ Output: Timing table, printed
+ Author: Zach Leffke
+'''
+import sys, os
+import argparse
+import copy
+import time
+import numpy as np
+import h5py
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config_utils as config
+import hdf5_utils as utils
+
+
+def evict_page_cache(fp, drop_all=False):
+    #Drop the clean pages of this file from the OS page cache.  drop_all
+    #flushes the page cache of the whole host instead (needs root, opt-in
+    #with --drop_caches), it falls back to the file when not permitted.
+    if drop_all:
+        try:
+            os.sync()
+            with open('/proc/sys/vm/drop_caches', 'w') as f:
+                f.write('1\n')
+                f.close()
+            return 'drop_caches'
+        except (IOError, OSError):
+            pass
+    fd = os.open(fp, os.O_RDONLY)
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+    return 'fadvise'
+
+def legacy_read(rd, start, stop):
+    #Converter reads before read_direct: allocate and convert per dataset
+    out = []
+    for key in utils.MONOPOLE_KEYS:
+        x = np.array(rd[key][start:stop], dtype=np.single)
+        x[np.isnan(x)] = 0
+        out.append(x.ravel())
+    return out
+
+def read_all(conv, method, block):
+    #Read every row of the file in blocks of packet rows, returns the sample count
+    num_rows = conv.rd[utils.MONOPOLE_KEYS[0]].shape[0]
+    if block <= 0:
+        block = num_rows
+    bufs = None
+    if method == 'read_direct':
+        block = conv._aligned_block(block)
+        bufs = [np.empty((block, utils.SAMPS_PER_PACKET), dtype=np.single) for key in utils.MONOPOLE_KEYS]
+    count = 0
+    for start in range(0, num_rows, block):
+        stop = min(start + block, num_rows)
+        if method == 'legacy':
+            rd = legacy_read(conv.rd, start, stop)
+        else:
+            rd = conv._read_radio_block(start, stop, bufs)
+        count += len(rd[0])
+    return count
+
+def time_case(conv, fp, cfg, method, block, cold, repeat, drop_all=False):
+    best = None
+    for i in range(repeat):
+        if cold:
+            evict_page_cache(fp, drop_all)
+        #reopen so the HDF5 chunk cache starts empty as well
+        h5 = h5py.File(fp, 'r', **utils.h5_file_options(cfg))
+        conv.rd = h5['RRI Data']
+        t0 = time.perf_counter()
+        read_all(conv, method, block)
+        dt = time.perf_counter() - t0
+        h5.close()
+        if best is None or dt < best: best = dt
+    return best
+
+if __name__ == '__main__':
+    #--------START Command Line option parser------------------------------------------------------
+    parser = argparse.ArgumentParser(description="RRI HDF5 Read Benchmark",
+                                     formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    config.add_config_args(parser)
+    parser.add_argument("--blocks", dest="blocks", type=str, default="0,1000,8192",
+                        help="Comma separated block sizes [packets], 0 reads the whole file", action="store")
+    parser.add_argument("--cache_mb", dest="cache_mb", type=str, default="1,16",
+                        help="Comma separated rdcc_nbytes [MB]", action="store")
+    parser.add_argument("--drivers", dest="drivers", type=str, default="default",
+                        help="Comma separated h5py file drivers (default, sec2, stdio, core)", action="store")
+    parser.add_argument("--repeat", dest="repeat", type=int, default=3,
+                        help="Timing repeats, best is reported", action="store")
+    parser.add_argument("--no_cold", dest="no_cold", action="store_true",
+                        help="Skip the cold page cache runs")
+    parser.add_argument("--drop_caches", dest="drop_caches", action="store_true",
+                        help="Cold runs flush the whole host page cache (root), instead of only this file's pages")
+    args = parser.parse_args()
+    #--------END Command Line option parser------------------------------------------------------
+    cfg = config.import_configs_yaml(args, verbose=False)
+    cfg['main']['verbose'] = False
+    cfg['main']['export']['iq'] = False
+    cfg['main']['export']['meta'] = False
+    cfg['main']['profile']['enable'] = False
+    fp = '/'.join([cfg['main']['rri_path'], cfg['main']['rri_file']])
+
+    conv = utils.HDF5_SigMF_Converter(cfg)
+    conv.get_metadata()
+    ds = conv.get_radio_data()[utils.MONOPOLE_KEYS[0]]
+    num_bytes = 4 * ds.size * ds.dtype.itemsize
+    print("File: {:s}".format(fp))
+    print("Dataset: {:} {:}, chunks {:}, compression {:}".format(ds.shape, ds.dtype, ds.chunks, ds.compression))
+    print("Page cache eviction: {:s}".format(evict_page_cache(fp, args.drop_caches)))
+    conv.h5_data.close()
+
+    caches = [('cold', True), ('warm', False)]
+    if args.no_cold: caches = caches[1:]
+    print("{:>8s} {:>8s} {:>8s} {:>12s} {:>5s} {:>10s} {:>10s}".format("driver", "cache MB", "block",
+                                                                     "method", "page", "time [s]", "MB/s"))
+    for driver in args.drivers.split(','):
+        for cache_mb in [float(c) for c in args.cache_mb.split(',')]:
+            case_cfg = copy.deepcopy(cfg)
+            case_cfg['h5']['driver'] = '' if driver == 'default' else driver
+            case_cfg['h5']['rdcc_nbytes'] = int(cache_mb * 1024 * 1024)
+            for block in [int(b) for b in args.blocks.split(',')]:
+                for page, cold in caches:
+                    for method in ['legacy', 'read_direct']:
+                        dt = time_case(conv, fp, case_cfg, method, block, cold, args.repeat, args.drop_caches)
+                        print("{:>8s} {:8.1f} {:8d} {:>12s} {:>5s} {:10.4f} {:10.1f}".format(driver, cache_mb, block,
+                                                                                          method, page, dt,
+                                                                                          num_bytes/dt/1e6))
+    sys.exit()
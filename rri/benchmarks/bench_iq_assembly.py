@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+'''
+  Title: RRI IQ Assembly Benchmark
+Project: ePOP RRI to GNU Radio
+   Date: Oct 2026
+   Desc: Compares the legacy np.vectorize(complex) IQ assembly against the
+         interleaved float32 buffer used by HDF5_SigMF_Converter.
+  Input: Level 1 RRI Data, HDF5 Format (from config file)
+ Output: Conversion throughput, printed
+ Author: Zach Leffke
+'''
+import sys, os
+import argparse
+import time
+import warnings
+import numpy as np
+warnings.filterwarnings("ignore")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config_utils as config
+import hdf5_utils as utils
+
+def legacy_iq(rd1, rd2, rd3, rd4):
+    #IQ assembly as it was done before the interleaved buffer
+    iq1 = np.vectorize(complex)(rd1,rd2).astype(dtype=np.csingle)
+    iq2 = np.vectorize(complex)(rd3,rd4).astype(dtype=np.csingle)
+    return iq1, iq2
+
+def time_it(func, *args, repeat=3):
+    best = None
+    for i in range(repeat):
+        t0 = time.perf_counter()
+        out = func(*args)
+        dt = time.perf_counter() - t0
+        if best is None or dt < best: best = dt
+    return best, out
+
+if __name__ == '__main__':
+    #--------START Command Line option parser------------------------------------------------------
+    parser = argparse.ArgumentParser(description="RRI IQ Assembly Benchmark",
+                                     formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    config.add_config_args(parser)
+    parser.add_argument("--max_packets", dest="max_packets", type=int, default=0,
+                        help="Limit packets read from the file, 0=all", action="store")
+    parser.add_argument("--repeat", dest="repeat", type=int, default=3,
+                        help="Timing repetitions, best is reported", action="store")
+    parser.add_argument("--skip_legacy", dest="skip_legacy", action="store_true",
+                        help="Only time the vectorized path")
+    args = parser.parse_args()
+    #--------END Command Line option parser------------------------------------------------------
+    cfg = config.import_configs_yaml(args)
+    cfg['main']['verbose'] = False
+    cfg['main']['export']['iq'] = False
+    cfg['main']['export']['meta'] = False
+
+    conv = utils.HDF5_SigMF_Converter(cfg)
+    conv.get_metadata()
+    conv.get_radio_data()
+    stop = args.max_packets if args.max_packets > 0 else None
+    rd1, rd2, rd3, rd4 = conv._read_radio_block(0, stop)
+    num_samps = len(rd1)
+    num_bytes = 2 * num_samps * np.dtype(np.csingle).itemsize
+    print("Settings: {:s} {:s}".format(conv.metadata['RRI Settings']['Antenna Configuration'],
+                                       conv.metadata['RRI Settings']['Data Format']))
+    print("Samples per channel: {:d}, IQ output bytes: {:d}".format(num_samps, num_bytes))
+
+    t_new, iqs = time_it(conv._convert_radio_block, rd1, rd2, rd3, rd4, repeat=args.repeat)
+    print("vectorized: {:8.4f} s {:10.2f} MSamp/s {:10.2f} MB/s".format(
+        t_new, 2*num_samps/t_new/1e6, num_bytes/t_new/1e6))
+
+    if not args.skip_legacy:
+        t_old, (ref1, ref2) = time_it(legacy_iq, rd1, rd2, rd3, rd4, repeat=args.repeat)
+        print("    legacy: {:8.4f} s {:10.2f} MSamp/s {:10.2f} MB/s".format(
+            t_old, 2*num_samps/t_old/1e6, num_bytes/t_old/1e6))
+        print("   speedup: {:8.1f}x".format(t_old/t_new))
+        if conv.metadata['RRI Settings']['Antenna Configuration'] == 'Dipole':
+            print("     match: {:}".format(np.array_equal(iqs[0], ref1) and np.array_equal(iqs[1], ref2)))
+    sys.exit()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+'''
+  Title: RRI Conversion Pipeline Benchmark
+Project: ePOP RRI to GNU Radio
+   Date: Oct 2026
+   Desc: Generates synthetic RRI HDF5 files of several durations and runs
+         rri_to_sigmf.py, rri_to_stk.py and rri_snr_convert.py (IQ SNR
+         estimate) on each one in a child process, reporting wall time,
+         throughput and peak RSS for every stage and size.
+  Input: Base config file, list of durations
+ Output: Results table, printed, and optional JSON
+ Author: Zach Leffke
+'''
+import sys, os
+import argparse
+import json
+import shutil
+import subprocess
+import tempfile
+import time
+import yaml
+
+RRI_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RRI_DIR)
+import config_utils as config
+import gen_synthetic_rri as gen
+
+STAGES = ['rri_to_sigmf', 'rri_to_stk', 'rri_snr_convert']
+
+
+def run_stage(script, cfg_path):
+    #Run one pipeline stage in a child process, returns wall time [sec] and
+    #the peak RSS of that child only [MB] (from wait4)
+    cmd = [sys.executable, '/'.join([RRI_DIR, script + '.py']), '--cfg_path', cfg_path]
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=RRI_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    _, status, rusage = os.wait4(proc.pid, 0)
+    elapsed = time.perf_counter() - t0
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    err = proc.stderr.read().decode('utf-8', 'replace')
+    proc.stderr.close()
+    if proc.returncode != 0 or 'Traceback' in err:
+        print("    ERROR in {:s}:\n{:s}".format(script, err))
+    return elapsed, rusage.ru_maxrss / 1024.0
+
+def stage_config(base_cfg, work_path, rri_file, overrides):
+    cfg = yaml.safe_load(yaml.safe_dump(base_cfg))
+    cfg['main']['rri_path'] = work_path
+    cfg['main']['rri_file'] = rri_file
+    cfg['main']['verbose'] = False
+    cfg['stk']['verbose'] = False
+    cfg['manifest']['enable'] = False
+    cfg['meta_cache']['enable'] = False
+    cfg['snr']['source'] = 'iq'
+    for key, val in overrides.items():
+        d = cfg
+        keys = key.split('.')
+        for k in keys[:-1]:
+            d = d[k]
+        d[keys[-1]] = yaml.safe_load(val)
+    with open('/'.join([work_path, 'config.yaml']), 'w') as f:
+        yaml.safe_dump(cfg, f, sort_keys=False)
+        f.close()
+
+if __name__ == '__main__':
+    #--------START Command Line option parser------------------------------------------------------
+    parser = argparse.ArgumentParser(description="RRI Conversion Pipeline Benchmark",
+                                     formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    config.add_config_args(parser)
+    parser.set_defaults(cfg_path='/'.join([RRI_DIR, 'config']))
+    parser.add_argument("--durations", dest="durations", type=str, default="10,60,300",
+                        help="Comma separated synthetic pass durations [sec]", action="store")
+    parser.add_argument("--stages", dest="stages", type=str, default=",".join(STAGES),
+                        help="Comma separated stages to run", action="store")
+    parser.add_argument("--set", dest="overrides", type=str, nargs='*', default=[],
+                        help="Config overrides, e.g. main.stream.enable=True", action="store")
+    parser.add_argument("--work_path", dest="work_path", type=str, default=None,
+                        help="Parent of the temp dir for synthetic files, default is the system temp dir", action="store")
+    parser.add_argument("--keep", dest="keep", action="store_true",
+                        help="Keep the synthetic files and products of every duration")
+    parser.add_argument("--json", dest="json_fp", type=str, default=None,
+                        help="Write results to this JSON file", action="store")
+    args = parser.parse_args()
+    #--------END Command Line option parser------------------------------------------------------
+    base_cfg = config.import_configs_yaml(args, verbose=False)
+    overrides = dict(o.split('=', 1) for o in args.overrides)
+    #everything is written to a fresh directory of our own, an existing
+    #--work_path is never cleaned
+    work_path = tempfile.mkdtemp(prefix='rri_bench_', dir=args.work_path)
+    stages = args.stages.split(',')
+    print("Work path: {:s}".format(work_path))
+
+    results = []
+    print("{:>9s} {:>9s} {:>16s} {:>9s} {:>9s} {:>9s}".format("dur [s]", "in [MB]", "stage",
+                                                             "wall [s]", "MB/s", "RSS [MB]"))
+    for dur in [float(d) for d in args.durations.split(',')]:
+        case_path = tempfile.mkdtemp(prefix='dur_{:g}_'.format(dur), dir=work_path)
+        fn = gen.synthetic_filename(gen.datetime.datetime(2019, 5, 19, 4, 50, 14,
+                                                          tzinfo=gen.datetime.timezone.utc), dur)
+        fp = '/'.join([case_path, fn])
+        gen.write_synthetic_rri(fp, dur)
+        size_mb = os.path.getsize(fp) / 1e6
+        stage_config(base_cfg, case_path, fn, overrides)
+        for stage in stages:
+            elapsed, rss = run_stage(stage, case_path)
+            res = {'duration': dur, 'input_mb': size_mb, 'stage': stage,
+                   'elapsed': elapsed, 'mb_per_sec': size_mb / elapsed, 'peak_rss_mb': rss}
+            results.append(res)
+            print("{:9.1f} {:9.1f} {:>16s} {:9.2f} {:9.1f} {:9.1f}".format(dur, size_mb, stage,
+                                                                          elapsed, res['mb_per_sec'], rss))
+        if not args.keep:
+            shutil.rmtree(case_path)
+    if not args.keep:
+        os.rmdir(work_path)
+    if args.json_fp is not None:
+        with open(args.json_fp, 'w') as f:
+            f.write(json.dumps(results, indent=4))
+            f.close()
+    sys.exit()
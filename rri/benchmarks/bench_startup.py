@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+'''
+  Title: RRI Command Startup Benchmark
+Project: ePOP RRI to GNU Radio
+   Date: Oct 2026
+   Desc: Wall time of 'rri.py --help' and 'rri.py info' as fresh processes,
+         median of several runs, checked against a budget.  Also checks that
+         argument parsing does not import numpy, h5py or pandas.  Exits
+         non-zero when a budget is exceeded or a heavy module is imported.
+  Input: RRI configuration file (for info)
+ Output: Timing table, printed
+ Author: Zach Leffke
+'''
+import sys, os
+import argparse
+import subprocess
+import time
+
+RRI_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RRI_CMD = os.path.join(RRI_DIR, 'rri.py')
+HEAVY_MODULES = ['numpy', 'h5py', 'pandas', 'scipy']
+
+
+def time_command(cmd, runs):
+    times = []
+    for i in range(runs):
+        t0 = time.perf_counter()
+        res = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        times.append(time.perf_counter() - t0)
+        if res.returncode != 0:
+            print("ERROR: {:s} failed: {:s}".format(" ".join(cmd), res.stderr.decode().strip()))
+            sys.exit(1)
+    times.sort()
+    return times[len(times) // 2]
+
+def heavy_imports():
+    #modules loaded by building the parser and parsing a command line
+    code = ("import sys; sys.path.insert(0, {:}); sys.argv = ['rri.py', 'info'];"
+            "import runpy; rri = runpy.run_path({:}, run_name='rri');"
+            "rri['build_parser']().parse_args(sys.argv[1:]);"
+            "print(','.join(m for m in {:} if m in sys.modules))").format(repr(RRI_DIR), repr(RRI_CMD), HEAVY_MODULES)
+    out = subprocess.run([sys.executable, '-c', code], stdout=subprocess.PIPE, check=True).stdout.decode().strip()
+    return [m for m in out.split(',') if m != '']
+
+
+if __name__ == '__main__':
+    #--------START Command Line option parser------------------------------------------------------
+    parser = argparse.ArgumentParser(description="RRI Command Startup Benchmark",
+                                     formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument("--cfg_path", dest="cfg_path", type=str, default=os.path.join(os.getcwd(), 'config'),
+                        help="Configuration File Path for 'rri.py info'", action="store")
+    parser.add_argument("--runs", dest="runs", type=int, default=7,
+                        help="Runs per command, the median is reported", action="store")
+    parser.add_argument("--help_budget", dest="help_budget", type=float, default=0.30,
+                        help="Budget for 'rri.py --help' [sec]", action="store")
+    parser.add_argument("--info_budget", dest="info_budget", type=float, default=0.75,
+                        help="Budget for 'rri.py info' [sec]", action="store")
+    args = parser.parse_args()
+    #--------END Command Line option parser------------------------------------------------------
+
+    ok = True
+    heavy = heavy_imports()
+    if len(heavy) > 0:
+        print("FAIL: argument parsing imports {:s}".format(", ".join(heavy)))
+        ok = False
+    else:
+        print("Argument parsing imports none of: {:s}".format(", ".join(HEAVY_MODULES)))
+
+    cases = [('rri.py --help', [sys.executable, RRI_CMD, '--help'], args.help_budget),
+             ('rri.py info'  , [sys.executable, RRI_CMD, 'info', '--cfg_path', args.cfg_path], args.info_budget)]
+    baseline = time_command([sys.executable, '-c', 'pass'], args.runs)
+    print("Interpreter startup: {:.3f} s".format(baseline))
+    print("{:>14s} {:>10s} {:>10s} {:>6s}".format("command", "median [s]", "budget [s]", ""))
+    for name, cmd, budget in cases:
+        t = time_command(cmd, args.runs)
+        passed = t <= budget
+        ok = ok and passed
+        print("{:>14s} {:10.3f} {:10.3f} {:>6s}".format(name, t, budget, 'ok' if passed else 'FAIL'))
+    sys.exit(0 if ok else 1)
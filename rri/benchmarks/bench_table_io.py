@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+'''
+  Title: RRI Table Output Benchmark
+Project: ePOP RRI to GNU Radio
+   Date: Oct 2026
+   Desc: Write/reload time and file size of the SNR time series in each
+         table_utils format (CSV, Parquet, Feather, HDF5).
+  Input: Synthetic SNR time series
+ Output: Timing and size table, printed
+ Author: Zach Leffke
+'''
+import sys, os
+import argparse
+import tempfile
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import snr_utils as snr
+import table_utils as table
+
+
+if __name__ == '__main__':
+    #--------START Command Line option parser------------------------------------------------------
+    parser = argparse.ArgumentParser(description="RRI Table Output Benchmark",
+                                     formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument("--rows", dest="rows", type=int, default=5000000,
+                        help="SNR samples in the synthetic time series", action="store")
+    parser.add_argument("--chunk_rows", dest="chunk_rows", type=int, default=1000000,
+                        help="Rows per write", action="store")
+    parser.add_argument("--formats", dest="formats", type=str, default="csv,parquet,feather,hdf5",
+                        help="Comma separated formats to test", action="store")
+    parser.add_argument("--out_path", dest="out_path", type=str, default=None,
+                        help="Directory for the test files, default is a temp dir", action="store")
+    args = parser.parse_args()
+    #--------END Command Line option parser------------------------------------------------------
+
+    rng = np.random.default_rng(0)
+    snr_a = (10 + rng.standard_normal(args.rows)).astype(np.single)
+    snr_b = (12 + rng.standard_normal(args.rows)).astype(np.single)
+    start = 1558241414.0
+    samp_rate = 1000.0
+
+    out_path = args.out_path if args.out_path is not None else tempfile.mkdtemp(prefix='rri_table_')
+    print("Rows: {:d}, output path: {:s}".format(args.rows, out_path))
+    print("{:>8s} {:>10s} {:>10s} {:>10s} {:>12s}".format("format", "write [s]", "read [s]", "size [MB]", "rows/s write"))
+    base = None
+    for fmt in args.formats.split(','):
+        o_fp = table.table_filepath('/'.join([out_path, 'bench_SNR']), fmt)
+        try:
+            t0 = time.perf_counter()
+            snr.export_snr_table(o_fp, start, samp_rate, snr_a, snr_b, fmt, True, args.chunk_rows)
+            t_write = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            df = table.import_table(o_fp)
+            t_read = time.perf_counter() - t0
+        except ImportError as e:
+            print("{:>8s} skipped: {:}".format(fmt, e))
+            continue
+        size = os.path.getsize(o_fp) / 1e6
+        print("{:>8s} {:10.3f} {:10.3f} {:10.2f} {:12.0f}".format(fmt, t_write, t_read, size, args.rows / t_write))
+        if base is None:
+            base = df
+        else:
+            ok = np.allclose(base[snr.SNR_COLUMNS].values, df[snr.SNR_COLUMNS].values)
+            if not ok: print("    WARNING: {:s} reload does not match".format(fmt))
+        os.remove(o_fp)
+    sys.exit()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+'''
+  Title: RRI Metadata Cache Round Trip Check
+Project: ePOP RRI to GNU Radio
+   Date: Oct 2026
+   Desc: Saves and reloads the cache_utils metadata cache and checks that
+         the loaded tree equals the saved one: a hand built tree with string,
+         bytes, single element and multi element arrays, and the converter
+         metadata of a synthetic RRI file that has a string array dataset,
+         eager and lazy, which must also agree with each other.  Exits non-zero on any mismatch.
+  Input: Synthetic RRI HDF5 file
+ Output: Check results, printed
+ Author: Zach Leffke
+'''
+import sys, os
+import argparse
+import copy
+import shutil
+import tempfile
+import h5py
+import numpy as np
+
+RRI_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RRI_DIR)
+import cache_utils as cache
+import config_utils as config
+import gen_synthetic_rri as gen
+import hdf5_utils as utils
+
+
+def diff_trees(a, b, path=''):
+    #List of the paths where two metadata trees differ in keys, type or value
+    if isinstance(a, dict) and isinstance(b, dict):
+        diffs = []
+        if set(a.keys()) != set(b.keys()):
+            diffs.append("{:s}: keys {:} != {:}".format(path, sorted(a.keys()), sorted(b.keys())))
+        for key in set(a.keys()) & set(b.keys()):
+            diffs += diff_trees(a[key], b[key], '/'.join([path, key]))
+        return diffs
+    if type(a) != type(b):
+        return ["{:s}: type {:s} != {:s}".format(path, type(a).__name__, type(b).__name__)]
+    if isinstance(a, np.ndarray):
+        same = a.dtype == b.dtype and a.shape == b.shape and np.array_equal(a, b, equal_nan=a.dtype.kind in 'fc')
+    else:
+        same = a == b
+    return [] if same else ["{:s}: value {:} != {:}".format(path, a, b)]
+
+def numeric_as_lists(tree):
+    #Eager metadata keeps numeric arrays as lists, lazy metadata as ndarrays
+    if isinstance(tree, dict):
+        return {key: numeric_as_lists(val) for key, val in tree.items()}
+    return tree.tolist() if isinstance(tree, np.ndarray) and tree.dtype.kind in 'biufc' else tree
+
+def check(name, diffs):
+    print("{:>36s}: {:s}".format(name, 'ok' if len(diffs) == 0 else 'FAIL'))
+    for d in diffs:
+        print("    {:s}".format(d))
+    return len(diffs) == 0
+
+def round_trip(h5_fp, tree, cache_dir):
+    cache.save_metadata_cache(h5_fp, tree, cache_dir)
+    return cache.load_metadata_cache(h5_fp, cache_dir)
+
+def converter_metadata(cfg):
+    conv = utils.HDF5_SigMF_Converter(cfg)
+    metadata = conv.get_metadata()
+    if isinstance(metadata, utils.HDF5_Lazy_Metadata):
+        metadata = metadata.to_dict()
+    if conv.h5_data is not None:
+        conv.h5_data.close()
+    return metadata
+
+
+if __name__ == '__main__':
+    #--------START Command Line option parser------------------------------------------------------
+    parser = argparse.ArgumentParser(description="RRI Metadata Cache Round Trip Check",
+                                     formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    config.add_config_args(parser)
+    parser.set_defaults(cfg_path='/'.join([RRI_DIR, 'config']))
+    parser.add_argument("--work_path", dest="work_path", type=str, default=None,
+                        help="Directory for the test files, default is a temp dir", action="store")
+    args = parser.parse_args()
+    #--------END Command Line option parser------------------------------------------------------
+    base_cfg = config.import_configs_yaml(args, verbose=False)
+    work_path = args.work_path if args.work_path is not None else tempfile.mkdtemp(prefix='rri_cache_')
+    cache_dir = '/'.join([work_path, 'cache'])
+    fn = gen.synthetic_filename(gen.datetime.datetime(2019, 5, 19, 4, 50, 14,
+                                                      tzinfo=gen.datetime.timezone.utc), 2.0)
+    fp = '/'.join([work_path, fn])
+    gen.write_synthetic_rri(fp, 2.0)
+    with h5py.File(fp, 'a') as h5:
+        #multi element string dataset, as found in some RRI Settings groups
+        h5['RRI Settings'].create_dataset('Comments', data=np.array([b'first', b'second']))
+        h5.close()
+    print("Work path: {:s}".format(work_path))
+
+    ok = True
+    tree = {
+        'Group': {
+            'string array'   : np.array(['a', 'bc']),
+            'bytes array'    : np.array([b'a', b'bc']),
+            'one element'    : np.array([1.5]),
+            'numeric array'  : np.arange(5, dtype=np.float32),
+            'numeric list'   : [1.0, 2.0, 3.0],
+            'one element list': [7],
+            'string'         : 'text',
+            'numpy scalar'   : np.float64(2.5),
+            'Nested'         : {'int': 3, 'strings': ['x', 'y']},
+        }
+    }
+    expected = copy.deepcopy(tree)
+    #non-numeric arrays and numpy scalars are stored as plain JSON values
+    expected['Group']['string array'] = ['a', 'bc']
+    expected['Group']['bytes array'] = ['a', 'bc']
+    expected['Group']['numpy scalar'] = 2.5
+    ok &= check("hand built tree", diff_trees(expected, round_trip(fp, tree, cache_dir)))
+
+    cfg = copy.deepcopy(base_cfg)
+    cfg['main']['rri_path'] = work_path
+    cfg['main']['rri_file'] = fn
+    cfg['main']['verbose'] = False
+    cfg['meta_cache']['dir'] = cache_dir
+    trees = {}
+    for mode, lazy in [('eager', False), ('lazy', True)]:
+        cfg['main']['lazy_meta'] = lazy
+        shutil.rmtree(cache.cache_dirpath(fp, cache_dir), ignore_errors=True) #the first converter writes it
+        cfg['meta_cache']['enable'] = False
+        trees[mode] = converter_metadata(cfg)
+        cfg['meta_cache']['enable'] = True
+        saved = converter_metadata(cfg)
+        loaded = converter_metadata(cfg)
+        ok &= check("converter metadata, {:s}".format(mode), diff_trees(saved, loaded))
+    #same keys, strings and value types in both modes
+    ok &= check("lazy matches eager", diff_trees(numeric_as_lists(trees['eager']),
+                                                 numeric_as_lists(trees['lazy'])))
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+'''
+  Title: RRI Metadata Cache
+Project: ePOP RRI to GNU Radio
+   Date: Oct 2026
+   Desc: Sidecar cache of the HDF5_SigMF_Converter metadata tree.  Scalars
+         and strings go to a compact JSON file, numeric arrays (ephemeris
+         columns) to .npy files.  The cache is keyed by the size and mtime
+         of the source HDF5 file and is ignored once the source changes.
+         Each cache is written to a temporary sibling directory and renamed
+         into place, so concurrent readers and writers never see a partial
+         one.
+         Deliberately free of h5py so cached metadata loads without it.
+ Author: Zach Leffke, KJ4QLP
+'''
+import sys, os
+import json
+import shutil
+import tempfile
+import numpy as np
+
+CACHE_VERSION = 2
+CACHE_META_FILE = 'metadata.json'
+CACHE_SUFFIX = '.meta-cache'
+
+
+def cache_dirpath(h5_fp, cache_dir=None):
+    #Sidecar directory next to the HDF5 file unless a cache dir is configured
+    fn = os.path.basename(h5_fp) + CACHE_SUFFIX
+    if cache_dir:
+        return '/'.join([cache_dir, fn])
+    return '/'.join([os.path.dirname(os.path.abspath(h5_fp)), fn])
+
+def source_identity(h5_fp):
+    st = os.stat(h5_fp)
+    return {'file': os.path.basename(h5_fp), 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+def _plain(val):
+    #JSON safe copy of a non-numeric value: numpy scalars to python types,
+    #string/bytes/object arrays to lists of str
+    if isinstance(val, np.ndarray):
+        return [_plain(x) for x in val.tolist()] if val.ndim > 0 else _plain(val.item())
+    if isinstance(val, (list, tuple)):
+        return [_plain(x) for x in val]
+    if isinstance(val, (bytes, np.bytes_)):
+        return val.decode('utf-8')
+    if isinstance(val, np.generic):
+        return val.item()
+    return val
+
+def _encode(tree, arrays):
+    #Split the metadata tree into a JSON tree and a list of numeric arrays,
+    #arrays are replaced by {"__npy__": index}.  Every numeric ndarray and
+    #numeric lists of more than one value go to .npy, anything else is made
+    #JSON safe (string arrays are stored as lists of str).
+    out = {}
+    for key, val in tree.items():
+        if isinstance(val, dict):
+            out[key] = _encode(val, arrays)
+            continue
+        if isinstance(val, (list, np.ndarray)):
+            arr = np.asarray(val) if isinstance(val, np.ndarray) or len(val) > 1 else None
+            if arr is not None and arr.dtype.kind in 'biufc':
+                out[key] = {'__npy__': len(arrays), 'list': isinstance(val, list)}
+                arrays.append(arr)
+                continue
+        out[key] = _plain(val)
+    return out
+
+def _array_filename(token, idx):
+    #the token of the write is part of every array name, arrays of another
+    #write are never mixed in if the directory is replaced while loading
+    return 'arr_{:s}_{:03d}.npy'.format(token, idx)
+
+def _decode(tree, cache_fp, token):
+    out = {}
+    for key, val in tree.items():
+        if isinstance(val, dict) and '__npy__' in val:
+            arr = np.load('/'.join([cache_fp, _array_filename(token, val['__npy__'])]))
+            out[key] = arr.tolist() if val['list'] else arr
+        elif isinstance(val, dict):
+            out[key] = _decode(val, cache_fp, token)
+        else:
+            out[key] = val
+    return out
+
+def load_metadata_cache(h5_fp, cache_dir=None, verbose=False):
+    #Returns the cached metadata tree, or None if missing or stale
+    cache_fp = cache_dirpath(h5_fp, cache_dir)
+    meta_fp = '/'.join([cache_fp, CACHE_META_FILE])
+    if not os.path.exists(meta_fp) or not os.path.exists(h5_fp):
+        return None
+    try:
+        with open(meta_fp, 'r') as f:
+            cached = json.load(f)
+            f.close()
+    except (IOError, OSError, ValueError):
+        #replaced by a concurrent writer while opening
+        return None
+    if cached.get('version') != CACHE_VERSION or cached.get('source') != source_identity(h5_fp):
+        if verbose: print("Metadata cache is stale: {:s}".format(cache_fp))
+        return None
+    if verbose: print("Loading metadata cache: {:s}".format(cache_fp))
+    try:
+        return _decode(cached['metadata'], cache_fp, cached['token'])
+    except (IOError, OSError, ValueError):
+        #lost a race with a concurrent writer, read the HDF5 file instead
+        if verbose: print("Metadata cache replaced while loading: {:s}".format(cache_fp))
+        return None
+
+def save_metadata_cache(h5_fp, metadata, cache_dir=None, verbose=False):
+    cache_fp = cache_dirpath(h5_fp, cache_dir)
+    parent = os.path.dirname(cache_fp)
+    os.makedirs(parent, exist_ok=True)
+    tmp_fp = tempfile.mkdtemp(prefix=os.path.basename(cache_fp) + '.tmp-', dir=parent)
+    token = os.path.basename(tmp_fp).rsplit('-', 1)[-1]
+    try:
+        arrays = []
+        tree = _encode(metadata, arrays)
+        for i, arr in enumerate(arrays):
+            np.save('/'.join([tmp_fp, _array_filename(token, i)]), arr)
+        cached = {'version': CACHE_VERSION, 'source': source_identity(h5_fp), 'token': token, 'metadata': tree}
+        with open('/'.join([tmp_fp, CACHE_META_FILE]), 'w') as f:
+            f.write(json.dumps(cached))
+            f.close()
+        _replace_dir(tmp_fp, cache_fp)
+    finally:
+        #left over only if another writer's cache was installed instead
+        shutil.rmtree(tmp_fp, ignore_errors=True)
+    if verbose: print("Wrote metadata cache: {:s}".format(cache_fp))
+    return cache_fp
+
+def _replace_dir(src, dst):
+    #Rename the complete cache directory src to dst.  A directory only
+    #replaces an empty one, so an existing cache is first renamed aside and
+    #removed.  If a concurrent writer installs its cache in between, that
+    #equivalent cache is kept and src is discarded by the caller.
+    try:
+        os.replace(src, dst)
+        return
+    except OSError:
+        pass
+    old = tempfile.mkdtemp(prefix=os.path.basename(dst) + '.old-', dir=os.path.dirname(dst))
+    try:
+        os.replace(dst, '/'.join([old, 'cache']))
+    except OSError:
+        pass #already moved by another writer
+    try:
+        os.replace(src, dst)
+    except OSError:
+        pass #lost the race
+    shutil.rmtree(old, ignore_errors=True)
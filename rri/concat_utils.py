@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+'''
+  Title: RRI Pass Concatenation
+Project: ePOP RRI to GNU Radio
+   Date: Oct 2026
+   Desc: Streams the IQ of several consecutive RRI HDF5 files, ordered by
+         ephemeris start time, into a single SigMF recording per channel
+         with one capture segment per source file and the gaps marked.
+ Author: Zach Leffke, KJ4QLP
+'''
+import sys, os, copy
+import numpy as np
+
+import hdf5_utils as utils
+import batch_utils as batch
+
+
+def open_passes(cfg, files):
+    #Converter per RRI file with its metadata loaded, sorted by ephemeris start
+    convs = []
+    for fp in files:
+        conv = utils.HDF5_SigMF_Converter(batch.file_config(cfg, fp))
+        conv.get_metadata()
+        convs.append(conv)
+    convs.sort(key=lambda conv: conv.ephem.start)
+    return convs
+
+def check_compatible(convs):
+    #Every pass must have the RRI Settings of the first one
+    ref = convs[0].metadata['RRI Settings']
+    ok = True
+    for conv in convs[1:]:
+        settings = conv.metadata['RRI Settings']
+        diff = sorted(k for k in set(ref) | set(settings) if ref.get(k) != settings.get(k))
+        if len(diff) > 0:
+            ok = False
+            print("ERROR: RRI Settings of {:s} differ from {:s}:".format(conv.cfg['main']['rri_file'],
+                                                                      convs[0].cfg['main']['rri_file']))
+            for key in diff:
+                print("  {:s}: {:} != {:}".format(key, settings.get(key), ref.get(key)))
+    return ok
+
+def concat_filename(convs):
+    #RRI filename spanning the passes, date and start of the first, stop of the last
+    fn_first = convs[0].cfg['main']['rri_file'].split("_")
+    fn_last = convs[-1].cfg['main']['rri_file'].split("_")
+    return "_".join(fn_first[0:3] + fn_last[3:4] + fn_first[4:])
+
+def concat_passes(cfg, files):
+    #Convert files into one SigMF recording per output stream.  Each pass is
+    #streamed block by block into the shared data files, so at most one block
+    #of packets is held in memory.  Returns the list of output files.
+    cfg = copy.deepcopy(cfg)
+    cfg['main']['stream']['enable'] = True
+    #the window, the quantization scale, the ephemeris annotations
+    #(interpolated from a single pass) and the packet quality statistics are
+    #per pass and do not apply to a concatenation
+    cfg['main']['window'] = {'start': '', 'stop': ''}
+    cfg['main']['quantize']['enable'] = False
+    cfg['ephem_annotations']['enable'] = False
+    cfg['quality']['enable'] = False
+
+    convs = open_passes(cfg, files)
+    if not check_compatible(convs):
+        sys.exit()
+    head = convs[0]
+    head._set_streams()
+
+    out_cfg = copy.deepcopy(cfg)
+    out_cfg['main']['rri_path'] = cfg['concat']['output_path'] or head.cfg['main']['rri_path']
+    out_cfg['main']['rri_file'] = concat_filename(convs)
+    sigmf_fps = utils.gen_sigmf_filepaths(out_cfg, head.stream_names)
+    print("Concatenating {:d} passes into:".format(len(convs)))
+    for name in head.stream_names:
+        print("  Channel {:s}: {:s}".format(name, sigmf_fps[name]['data']))
+
+    files_out = {}
+    if cfg['main']['export']['iq']:
+        files_out = {name: open(sigmf_fps[name]['data'], 'wb') for name in head.stream_names}
+    segments = []
+    seg_utc = []
+    samp_count = 0
+    prev_stop = None
+    try:
+        for conv in convs:
+            print("Pass: {:s}".format(conv._get_rri_filepath()))
+            conv.get_radio_iq(files_out)
+            conv._gen_capture_segments()
+            #seconds between the end of the previous pass and this one
+            gap = None if prev_stop is None else conv.capture_utc[0] - prev_stop
+            if gap is not None and gap < 0:
+                print("WARNING: Pass overlaps the previous one by {:.6f} sec".format(-gap))
+            for i, seg in enumerate(conv.capture_segments):
+                seg = dict(seg)
+                seg['core:sample_start'] += samp_count
+                seg['rri:source_file'] = conv.cfg['main']['rri_file']
+                if i == 0 and gap is not None:
+                    seg['rri:gap_sec'] = float(gap)
+                segments.append(seg)
+            seg_utc.extend(conv.capture_utc)
+            samp_count += conv.samp_count
+            prev_stop = conv.row_utc[conv.rows[1] - 1] + utils.SAMPS_PER_PACKET * conv.RRI_SAMP_RATE_REAL
+            #release the pass before the next one is opened
+            conv.h5_data.close()
+            conv.stage_buf = None
+    finally:
+        for f in files_out.values():
+            f.close()
+
+    #metadata of the concatenation, built by the first pass converter from
+    #the combined capture segments
+    head.capture_segments = segments
+    head.capture_utc = np.asarray(seg_utc)
+    head.samp_count = samp_count
+    head.sigmf_fps = sigmf_fps
+    head._gen_sigmf_metadata()
+
+    gaps = [seg['rri:gap_sec'] for seg in segments if 'rri:gap_sec' in seg]
+    print("Concatenated {:d} passes, {:d} samples, {:d} capture segments".format(len(convs), samp_count,
+                                                                                len(segments)))
+    if len(gaps) > 0:
+        print("Gaps between passes [sec]: {:s}".format(", ".join("{:.3f}".format(g) for g in gaps)))
+    return head.output_files()
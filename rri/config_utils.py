@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+'''
+  Title: RRI Configuration Utilities
+Project: ePOP RRI to GNU Radio
+   Date: Oct 2026
+   Desc: Configuration file command line options and loading, shared by the
+         rri command and the conversion scripts.  Kept free of the numpy,
+         h5py and pandas imports so the command line starts quickly.
+ Author: Zach Leffke, KJ4QLP
+'''
+import sys, os
+import copy
+import yaml
+
+#the shipped configuration file, its values are the defaults of options
+#missing from older configuration files
+DEFAULTS_FP = '/'.join([os.path.dirname(os.path.abspath(__file__)), 'config', 'config.yaml'])
+#sections that are output content rather than options, never merged
+NO_DEFAULTS = ['sigmf']
+_defaults = None
+
+
+def add_config_args(parser):
+    #--cfg_path/--cfg_file option group
+    cwd = os.getcwd()
+    cfg_fp_default = '/'.join([cwd, 'config'])
+    cfg = parser.add_argument_group('Configuration File')
+    cfg.add_argument('--cfg_path',
+                       dest='cfg_path',
+                       type=str,
+                       default=cfg_fp_default,
+                       help="Configuration File Path",
+                       action="store")
+    cfg.add_argument('--cfg_file',
+                       dest='cfg_file',
+                       type=str,
+                       default="config.yaml",
+                       help="Configuration File",
+                       action="store")
+    return cfg
+
+def import_configs_yaml(args, verbose=True):
+    ''' setup configuration data '''
+    fp_cfg = '/'.join([args.cfg_path,args.cfg_file])
+    if not os.path.isfile(fp_cfg) == True:
+        print('ERROR: Invalid Configuration File: {:s}'.format(fp_cfg))
+        sys.exit()
+    if verbose: print('Importing configuration File: {:s}'.format(fp_cfg))
+    with open(fp_cfg, 'r') as yaml_file:
+        cfg = yaml.safe_load(yaml_file)
+        yaml_file.close()
+
+    if cfg['main']['base_path'] == 'cwd':
+        cfg['main']['base_path'] = os.getcwd()
+    return apply_defaults(cfg)
+
+def default_config():
+    #shipped configuration, loaded once, empty if it is not installed
+    global _defaults
+    if _defaults is None:
+        _defaults = {}
+        if os.path.isfile(DEFAULTS_FP):
+            with open(DEFAULTS_FP, 'r') as yaml_file:
+                _defaults = yaml.safe_load(yaml_file)
+                yaml_file.close()
+    return _defaults
+
+def _merge_missing(cfg, defaults, skip=()):
+    for key, val in defaults.items():
+        if key not in cfg:
+            cfg[key] = copy.deepcopy(val)
+        elif key not in skip and isinstance(cfg[key], dict) and isinstance(val, dict):
+            _merge_missing(cfg[key], val)
+
+def apply_defaults(cfg):
+    #Fill in the options an older configuration file does not have with the
+    #shipped defaults, in place.  Values that are present are never changed.
+    _merge_missing(cfg, default_config(), NO_DEFAULTS)
+    return cfg
+
+def add_sigmf_args(parser):
+    #SigMF conversion options that override the configuration file
+    parser.add_argument("--batch", dest = "batch", action = "store", type = str, default=None, help = "Batch convert a directory or glob of RRI files, overrides config")
+    parser.add_argument("--workers", dest = "workers", action = "store", type = int, default=None, help = "Batch worker processes, overrides config")
+    parser.add_argument("--concat", dest = "concat", action = "store", type = str, default=None, help = "Concatenate a directory or glob of consecutive RRI files into one recording, overrides config")
+    parser.add_argument("--start", dest = "start", action = "store", type = str, default=None, help = "UTC window start, ISO 8601, overrides config")
+    parser.add_argument("--stop", dest = "stop", action = "store", type = str, default=None, help = "UTC window stop, ISO 8601, overrides config")
+
+def apply_sigmf_args(cfg, args):
+    if args.batch is not None:
+        cfg['batch']['enable'] = True
+        cfg['batch']['input'] = args.batch
+    if args.workers is not None:
+        cfg['batch']['workers'] = args.workers
+    if args.concat is not None:
+        cfg['concat']['enable'] = True
+        cfg['concat']['input'] = args.concat
+    if args.start is not None:
+        cfg['main']['window']['start'] = args.start
+    if args.stop is not None:
+        cfg['main']['window']['stop'] = args.stop
+    return cfg
+
+def add_daemon_args(parser):
+    #Conversion daemon options that override the configuration file
+    parser.add_argument("--input", dest = "input", action = "store", type = str, default=None, help = "Landing directory to watch, overrides config")
+    parser.add_argument("--workers", dest = "workers", action = "store", type = int, default=None, help = "Worker processes, overrides config")
+    parser.add_argument("--products", dest = "products", action = "store", type = str, default=None, help = "Comma separated products (sigmf, stk, snr), overrides config")
+    parser.add_argument("--max_files", dest = "max_files", action = "store", type = int, default=None, help = "Exit after this many files are finished")
+    parser.add_argument("--idle_exit", dest = "idle_exit", action = "store", type = float, default=None, help = "Exit after this many seconds with no files pending [sec]")
+
+def apply_daemon_args(cfg, args):
+    if args.input is not None:
+        cfg['daemon']['input'] = args.input
+    if args.workers is not None:
+        cfg['daemon']['workers'] = args.workers
+    if args.products is not None:
+        cfg['daemon']['products'] = args.products.split(',')
+    return cfg
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+'''
+  Title: RRI Conversion Daemon Utilities
+Project: ePOP RRI to GNU Radio
+   Date: Oct 2026
+   Desc: Polls a landing directory for new RRI HDF5 files and runs the
+         configured products of each one over a bounded pool of long lived
+         worker processes, with queue depth, latency and outcome counters
+         written to a status JSON file.
+ Author: Zach Leffke, KJ4QLP
+'''
+import sys, os, copy
+import glob
+import json
+import time
+import signal
+import collections
+import concurrent.futures
+
+import batch_utils as batch
+import manifest_utils as mfst
+import product_utils as prod
+
+
+class Directory_Watcher(object):
+    """
+    Polls a directory for files matching a glob pattern.  A file is reported
+    once, after its size and mtime have been unchanged for settle_sec, so
+    files still being copied into the directory are not picked up early.
+    """
+    def __init__(self, path, pattern='*.h5', settle_sec=2.0, existing=True):
+        self.path = path
+        self.pattern = pattern
+        self.settle_sec = settle_sec
+        self.pending = {} #fp -> (size, mtime_ns, first seen, identity unchanged since)
+        self.seen = set()
+        if not existing:
+            #files already in the directory at startup are never reported
+            self.seen.update(self._list())
+
+    def _list(self):
+        return sorted(glob.glob(os.path.join(self.path, self.pattern)))
+
+    def poll(self):
+        #Returns [(fp, arrival time)] of the files that settled since the last
+        #poll.  The arrival time is when the file was first seen.
+        now = time.time()
+        ready = []
+        for fp in self._list():
+            if fp in self.seen:
+                continue
+            try:
+                st = os.stat(fp)
+            except OSError:
+                continue #removed while listing
+            ident = (st.st_size, st.st_mtime_ns)
+            if fp not in self.pending:
+                self.pending[fp] = ident + (now, now)
+                continue
+            size, mtime_ns, arrived, since = self.pending[fp]
+            if (size, mtime_ns) != ident:
+                #still growing, restart the settle time
+                self.pending[fp] = ident + (arrived, now)
+            elif now - since >= self.settle_sec:
+                del self.pending[fp]
+                self.seen.add(fp)
+                ready.append((fp, arrived))
+        return ready
+
+
+def _worker_init():
+    #Ctrl-C goes to the whole process group, the daemon process stops the
+    #workers after their running conversion instead.  SIGTERM gets its
+    #default back from the daemon's handler, so the workers (and the SNR
+    #estimate pools they start) can still be terminated.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+def convert_products(cfg, fp, products):
+    #Pool worker, runs the products of one RRI file in dependency order and
+    #returns a result record per product instead of raising.  The manifest
+    #is checked and written by the daemon process only, the identities
+    #(content hashes) of the inputs are computed here so the daemon's
+    #polling loop never reads a whole input file.
+    cfg = batch.file_config(cfg, fp)
+    use_hash = cfg['manifest']['enable'] and cfg['manifest']['hash']
+    identities = {}
+    results = []
+    for product in products:
+        res = {'product': product, 'status': 'ok', 'outputs': [], 'inputs': {}, 'error': None, 'elapsed': 0.0}
+        t0 = time.perf_counter()
+        try:
+            res['outputs'] = prod.run_product(cfg, product)
+            if use_hash:
+                for in_fp in prod.product_inputs(cfg, product):
+                    if in_fp not in identities:
+                        identities[in_fp] = mfst.file_identity(in_fp)
+                    res['inputs'][in_fp] = identities[in_fp]
+        except (Exception, SystemExit) as e:
+            res['status'] = 'failed'
+            res['error'] = repr(e)
+        res['elapsed'] = time.perf_counter() - t0
+        results.append(res)
+        if res['status'] != 'ok' and product == 'sigmf':
+            #the products after it may read the SigMF files
+            break
+    return results
+
+
+class Conversion_Daemon(object):
+    """
+    Queues settled files from a Directory_Watcher and converts them over a
+    process pool of at most cfg daemon.workers workers.  The workers live as
+    long as the daemon, so the interpreter and its imports are paid once.
+    At most one file per worker is submitted, the rest wait in the queue.
+    """
+    def __init__(self, cfg):
+        self.cfg = cfg
+        dcfg = cfg['daemon']
+        self.path = os.path.abspath(os.path.expanduser(dcfg['input']))
+        if not os.path.isdir(self.path):
+            print('ERROR: Daemon input directory does not exist: {:s}'.format(self.path))
+            sys.exit()
+        self.products = [p for p in prod.PRODUCTS if p in dcfg['products']]
+        unknown = [p for p in dcfg['products'] if p not in prod.PRODUCTS]
+        if len(unknown) > 0 or len(self.products) == 0:
+            print('ERROR: Invalid daemon products: {:}, choose from {:}'.format(dcfg['products'], prod.PRODUCTS))
+            sys.exit()
+        self.workers = max(1, int(dcfg['workers']))
+        self.poll_sec = float(dcfg['poll_sec'])
+        self.status_fp = dcfg['status_file']
+        if not os.path.isabs(self.status_fp):
+            self.status_fp = '/'.join([self.path, self.status_fp])
+
+        self.watcher = Directory_Watcher(self.path, dcfg['pattern'], float(dcfg['settle_sec']),
+                                         dcfg['existing'])
+        #the manifest of the landing directory, only touched by this process
+        mcfg = copy.deepcopy(cfg)
+        mcfg['main']['rri_path'] = self.path
+        self.manifest = mfst.open_manifest(mcfg)
+        self.queue = collections.deque()
+        self.running = {}
+        self.pool = None
+        self.broken = False
+        self.stop = False
+
+        self.started = time.time()
+        self.counters = collections.OrderedDict([
+            ('discovered', 0),
+            ('converted' , 0),
+            ('failed'    , 0),
+            ('current'   , 0),
+        ])
+        self.product_counters = {p: {'ok': 0, 'failed': 0, 'current': 0, 'elapsed_sec': 0.0}
+                                 for p in self.products}
+        #arrival -> done latency of the most recent files
+        self.latencies = collections.deque(maxlen=int(dcfg['latency_window']))
+        self.last = None
+
+    def _todo_products(self, fcfg):
+        #products of a file that are not current in the manifest
+        if self.manifest is None:
+            return list(self.products)
+        todo = []
+        for product in self.products:
+            stale = (not prod.is_current(fcfg, product, self.manifest) or
+                     #a regenerated SigMF file invalidates an 'iq' SNR estimate
+                     (product == 'snr' and fcfg['snr']['source'] == 'iq' and 'sigmf' in todo))
+            if stale:
+                todo.append(product)
+            else:
+                self.product_counters[product]['current'] += 1
+        return todo
+
+    def _new_pool(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+        self.pool = concurrent.futures.ProcessPoolExecutor(max_workers=self.workers, initializer=_worker_init)
+        self.broken = False
+
+    def _submit(self):
+        #fill the free workers from the queue
+        if self.broken and len(self.running) == 0:
+            print("WARNING: Worker process died, restarting the worker pool")
+            self._new_pool()
+        while len(self.queue) > 0 and len(self.running) < self.workers:
+            fp, arrived = self.queue.popleft()
+            fcfg = batch.file_config(self.cfg, fp)
+            products = self._todo_products(fcfg)
+            if len(products) == 0:
+                print("Current, skipping: {:s}".format(fp))
+                self.counters['current'] += 1
+                continue
+            print("Converting {:s}: {:s}".format(", ".join(products), fp))
+            future = self.pool.submit(convert_products, self.cfg, fp, products)
+            self.running[future] = (fp, arrived, time.time())
+
+    def _collect(self):
+        #record the finished files and update the manifest
+        done = [f for f in self.running if f.done()]
+        for future in done:
+            fp, arrived, started = self.running.pop(future)
+            fcfg = batch.file_config(self.cfg, fp)
+            try:
+                results = future.result()
+            except Exception as e:
+                #the worker process itself died, the pool is replaced before
+                #the next submit
+                if isinstance(e, concurrent.futures.process.BrokenProcessPool):
+                    self.broken = True
+                results = [{'product': p, 'status': 'failed', 'outputs': [], 'inputs': {}, 'error': repr(e), 'elapsed': 0.0}
+                           for p in self.products]
+            ok = True
+            for res in results:
+                pc = self.product_counters[res['product']]
+                pc['elapsed_sec'] += res['elapsed']
+                if res['status'] != 'ok':
+                    ok = False
+                    pc['failed'] += 1
+                    print("    ERROR: {:s} {:s}: {:s}".format(res['product'], os.path.basename(fp), res['error']))
+                    continue
+                pc['ok'] += 1
+                if self.manifest is not None and res['outputs'] is not None and len(res['outputs']) > 0:
+                    self.manifest.update(res['product'], prod.product_inputs(fcfg, res['product']),
+                                         res['outputs'], mfst.product_config(fcfg, res['product']),
+                                         known=res['inputs'])
+            if self.manifest is not None:
+                self.manifest.save()
+            now = time.time()
+            latency = now - arrived
+            self.latencies.append(latency)
+            self.counters['converted' if ok else 'failed'] += 1
+            self.last = {'file': fp, 'status': 'ok' if ok else 'failed', 'latency_sec': latency,
+                         'convert_sec': now - started, 'finished': now}
+            print("{:6s} {:8.2f} s latency  {:s}".format('OK' if ok else 'FAILED', latency, os.path.basename(fp)))
+
+    def status(self):
+        lat = sorted(self.latencies)
+        latency = None
+        if len(lat) > 0:
+            latency = {
+                'count' : len(lat),
+                'mean'  : sum(lat) / len(lat),
+                'p50'   : lat[len(lat) // 2],
+                'p95'   : lat[min(len(lat) - 1, int(0.95 * len(lat)))],
+                'max'   : lat[-1],
+            }
+        now = time.time()
+        return {
+            'input'        : self.path,
+            'pid'          : os.getpid(),
+            'updated'      : now,
+            'uptime_sec'   : now - self.started,
+            'workers'      : self.workers,
+            'products'     : self.products,
+            'settling'     : len(self.watcher.pending),
+            'queue_depth'  : len(self.queue),
+            'running'      : len(self.running),
+            'oldest_wait_sec': now - self.queue[0][1] if len(self.queue) > 0 else 0.0,
+            'counters'     : dict(self.counters),
+            'product_counters': self.product_counters,
+            'latency_sec'  : latency,
+            'last'         : self.last,
+        }
+
+    def write_status(self):
+        #temp file and rename, readers never see a partial status
+        tmp = self.status_fp + '.tmp'
+        with open(tmp, 'w') as f:
+            f.write(json.dumps(self.status(), indent=4))
+            f.close()
+        os.replace(tmp, self.status_fp)
+
+    def _signal(self, signum, frame):
+        print("Signal {:d}, stopping after the running conversions...".format(signum))
+        self.stop = True
+
+    def run(self, max_files=None, idle_exit_sec=None):
+        #Poll until SIGINT/SIGTERM.  max_files and idle_exit_sec stop the
+        #daemon after that many finished files or seconds with nothing
+        #settling, queued or running (for one shot runs and testing).
+        signal.signal(signal.SIGINT, self._signal)
+        signal.signal(signal.SIGTERM, self._signal)
+        print("Watching {:s} ({:s}) with {:d} workers for: {:s}".format(self.path, self.cfg['daemon']['pattern'],
+                                                                        self.workers, ", ".join(self.products)))
+        print("Status File: {:s}".format(self.status_fp))
+        self._new_pool()
+        idle_since = time.time()
+        try:
+            while not self.stop:
+                for fp, arrived in self.watcher.poll():
+                    self.counters['discovered'] += 1
+                    self.queue.append((fp, arrived))
+                self._collect()
+                self._submit()
+                self.write_status()
+                finished = self.counters['converted'] + self.counters['failed'] + self.counters['current']
+                if max_files is not None and finished >= max_files:
+                    break
+                if len(self.queue) > 0 or len(self.running) > 0 or len(self.watcher.pending) > 0:
+                    idle_since = time.time()
+                elif idle_exit_sec is not None and time.time() - idle_since >= idle_exit_sec:
+                    break
+                if len(self.running) > 0:
+                    #wake up as soon as a conversion finishes
+                    concurrent.futures.wait(list(self.running), timeout=self.poll_sec,
+                                            return_when=concurrent.futures.FIRST_COMPLETED)
+                else:
+                    time.sleep(self.poll_sec)
+            #finish the running conversions, queued files are left for the
+            #next start (the manifest skips the finished ones)
+            concurrent.futures.wait(list(self.running))
+            self._collect()
+            self.write_status()
+        finally:
+            self.pool.shutdown()
+        return self.status()
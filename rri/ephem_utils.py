@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+'''
+  Title: RRI Ephemeris Utilities
+Project: ePOP RRI to GNU Radio
+   Date: Oct 2026
+   Desc: Columnar view of the CASSIOPE Ephemeris group, every column kept
+         as a numpy array with UTC time as float64 seconds and
+         datetime64[ns].
+ Author: Zach Leffke, KJ4QLP
+'''
+import sys, os
+import datetime
+import numpy as np
+
+MET_KEY = 'Ephemeris MET (seconds since May 24, 1968)'
+UTC_KEY = 'Ephemeris UTC [sec]'
+MET_EPOCH = datetime.datetime(1968, 5, 24, 0, 0, 0, tzinfo=datetime.timezone.utc)
+UTC_EPOCH = datetime.datetime(1970, 1, 1, 0, 0, 0, tzinfo=datetime.timezone.utc)
+#seconds between the MET epoch and the unix epoch
+MET_UTC_DELTA = UTC_EPOCH.timestamp() - MET_EPOCH.timestamp()
+
+
+def met_to_utc(met):
+    return np.asarray(met, dtype=np.float64) - MET_UTC_DELTA
+
+def utc_to_datetime64(utc):
+    #float64 unix seconds to datetime64[ns], rounded to the nearest ns
+    return np.round(np.asarray(utc, dtype=np.float64) * 1e9).astype(np.int64).view('datetime64[ns]')
+
+def parse_utc(t):
+    #unix seconds from a float, datetime, datetime64 or ISO 8601 string
+    if isinstance(t, str):
+        t = np.datetime64(t.rstrip('Z'), 'ns')
+    if isinstance(t, np.datetime64):
+        return t.astype('datetime64[ns]').astype(np.int64) / 1e9
+    if isinstance(t, datetime.datetime):
+        if t.tzinfo is None:
+            t = t.replace(tzinfo=datetime.timezone.utc)
+        return t.timestamp()
+    return float(t)
+
+
+class RRI_Ephemeris(object):
+    """
+    Columnar CASSIOPE ephemeris.
+    Columns are numpy arrays sharing the first axis, 'utc' holds float64
+    unix seconds and 'datetime' the same times as datetime64[ns].  Time
+    range selection is done with vectorized comparisons on 'utc'.
+    """
+    def __init__(self, columns, utc):
+        self.columns = columns
+        self.utc = np.asarray(utc, dtype=np.float64)
+        self.datetime = utc_to_datetime64(self.utc)
+
+    @classmethod
+    def from_metadata(cls, eph_meta):
+        #Build from the 'CASSIOPE Ephemeris' metadata group, all array
+        #columns with one row per MET sample are kept
+        met = np.asarray(eph_meta[MET_KEY], dtype=np.float64)
+        columns = {}
+        for key in eph_meta.keys():
+            if key == UTC_KEY:
+                continue
+            val = np.asarray(eph_meta[key])
+            if val.ndim >= 1 and val.shape[0] == len(met) and val.dtype.kind in 'biuf':
+                columns[key] = val
+        return cls(columns, met_to_utc(met))
+
+    def __len__(self):
+        return len(self.utc)
+
+    def __getitem__(self, key):
+        if key == UTC_KEY or key == 'utc':
+            return self.utc
+        if key == 'datetime':
+            return self.datetime
+        return self.columns[key]
+
+    def keys(self):
+        return [UTC_KEY] + list(self.columns.keys())
+
+    @property
+    def start(self):
+        return float(self.utc[0])
+
+    @property
+    def stop(self):
+        return float(self.utc[-1])
+
+    def start_datetime(self):
+        return datetime.datetime.fromtimestamp(self.start, tz=datetime.timezone.utc)
+
+    def time_mask(self, start=None, stop=None):
+        #boolean mask of rows with start <= utc <= stop
+        mask = np.ones(len(self.utc), dtype=bool)
+        if start is not None:
+            mask &= self.utc >= parse_utc(start)
+        if stop is not None:
+            mask &= self.utc <= parse_utc(stop)
+        return mask
+
+    def select(self, start=None, stop=None):
+        mask = self.time_mask(start, stop)
+        columns = {key: val[mask] for key, val in self.columns.items()}
+        return RRI_Ephemeris(columns, self.utc[mask])
+
+    def to_dataframe(self, keys=None):
+        import pandas as pd
+        if keys is None:
+            keys = [k for k in self.keys() if self[k].ndim == 1]
+        return pd.DataFrame({key: self[key] for key in keys})
+
+
+#ephemeris columns interpolated by default, angles are unwrapped first
+INTERP_KEYS = {
+    'Geographic Latitude (deg)' : False,
+    'Geographic Longitude (deg)': True,
+    'Altitude (km)'             : False,
+    'Roll (deg)'                : True,
+    'Pitch (deg)'               : True,
+    'Yaw (deg)'                 : True,
+}
+
+#SigMF annotation field for each interpolated column
+ANNOTATION_KEYS = {
+    'Geographic Latitude (deg)' : 'rri:latitude',
+    'Geographic Longitude (deg)': 'rri:longitude',
+    'Altitude (km)'             : 'rri:altitude',
+    'Roll (deg)'                : 'rri:roll',
+    'Pitch (deg)'               : 'rri:pitch',
+    'Yaw (deg)'                 : 'rri:yaw',
+}
+
+
+class Ephemeris_Interpolator(object):
+    """
+    Maps RRI sample indices to spacecraft position and attitude.
+    Sample index -> UTC uses the capture segments (first sample and UTC of
+    every contiguous packet run) and the sample period, UTC -> ephemeris
+    is linear interpolation of the columnar ephemeris.  Only the requested
+    indices are ever materialized, so blocks of any size can be queried
+    without building per sample arrays for the whole pass.
+    """
+    def __init__(self, eph, seg_sample_start, seg_utc, samp_period, keys=None):
+        if keys is None:
+            keys = INTERP_KEYS
+        self.samp_period = samp_period
+        self.seg_sample_start = np.asarray(seg_sample_start, dtype=np.int64)
+        self.seg_utc = np.asarray(seg_utc, dtype=np.float64)
+        self.utc = eph.utc
+        self.columns = {}
+        self.wrap = {}
+        for key, is_angle in keys.items():
+            col = np.asarray(eph[key], dtype=np.float64)
+            if is_angle:
+                #unwrap so interpolation never crosses the +/-180 seam, then
+                #wrap back into the range used by the source column
+                self.wrap[key] = 0.0 if col.min() >= 0 else -180.0
+                col = np.rad2deg(np.unwrap(np.deg2rad(col)))
+            self.columns[key] = col
+
+    def sample_utc(self, idx):
+        #UTC seconds of each sample index
+        idx = np.asarray(idx, dtype=np.int64)
+        seg = np.searchsorted(self.seg_sample_start, idx, side='right') - 1
+        seg = np.clip(seg, 0, len(self.seg_sample_start) - 1)
+        return self.seg_utc[seg] + (idx - self.seg_sample_start[seg]) * self.samp_period
+
+    def at_utc(self, utc):
+        #interpolated ephemeris columns at arbitrary UTC seconds
+        utc = np.asarray(utc, dtype=np.float64)
+        out = {}
+        for key, col in self.columns.items():
+            val = np.interp(utc, self.utc, col)
+            if key in self.wrap:
+                lo = self.wrap[key]
+                val = np.mod(val - lo, 360.0) + lo
+            out[key] = val
+        return out
+
+    def query(self, idx):
+        return self.at_utc(self.sample_utc(idx))
+
+    def query_block(self, start, count, step=1):
+        #ephemeris for samples [start, start+count) every step samples
+        idx = np.arange(start, start + count, step, dtype=np.int64)
+        out = self.query(idx)
+        out['sample_index'] = idx
+        return out
+
+    def iter_blocks(self, num_samps, block, step=1):
+        #generator over the whole pass, one block of sample indices at a time
+        for start in range(0, num_samps, block):
+            yield self.query_block(start, min(block, num_samps - start), step)
+
+    def annotations(self, num_samps, interval):
+        #SigMF annotations of the spacecraft state every interval samples,
+        #evaluated at the first sample of each annotation
+        starts = np.arange(0, num_samps, interval, dtype=np.int64)
+        if len(starts) == 0:
+            return []
+        counts = np.minimum(interval, num_samps - starts)
+        state = self.query(starts)
+        annots = []
+        for i in range(len(starts)):
+            annot = {'core:sample_start': int(starts[i]),
+                     'core:sample_count': int(counts[i])}
+            for key in self.columns.keys():
+                annot[ANNOTATION_KEYS.get(key, key)] = float(state[key][i])
+            annots.append(annot)
+        return annots
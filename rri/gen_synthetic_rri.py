@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+'''
+  Title: Synthetic RRI HDF5 Generator
+Project: ePOP RRI to GNU Radio
+   Date: Oct 2026
+   Desc: Writes synthetic Level 1 RRI HDF5 files with the layout expected
+         by HDF5_SigMF_Converter ('RRI Data' monopole datasets in 29 sample
+         packets, 'RRI Packet Numbers', 'RRI Settings' and
+         'CASSIOPE Ephemeris' with MET), for repeatable benchmarks.
+  Input: Duration and settings, command line
+ Output: RRI_<date>_<start>_<stop>_lv1_12.0.0.h5
+ Author: Zach Leffke
+'''
+import sys, os
+import argparse
+import datetime
+import numpy as np
+import h5py
+
+RRI_SAMP_RATE = 62500.33933
+SAMPS_PER_PACKET = 29
+MET_EPOCH = datetime.datetime(1968, 5, 24, 0, 0, 0, tzinfo=datetime.timezone.utc)
+
+
+def synthetic_filename(start, duration):
+    stop = start + datetime.timedelta(seconds=duration)
+    return "RRI_{:s}_{:s}_{:s}_lv1_12.0.0.h5".format(start.strftime("%Y%m%d"),
+                                                    start.strftime("%H%M%S"),
+                                                    stop.strftime("%H%M%S"))
+
+def write_synthetic_rri(fp, duration, start=None, antenna='Dipole', data_format='I1Q1I3Q3',
+                        tone_hz=1000.0, amplitude_mv=100.0, noise_mv=5.0, drop_every=0,
+                        nan_fraction=0.0, chunk_packets=16384, seed=0):
+    #Write a synthetic RRI file of the given duration [sec].  Samples are a
+    #complex tone plus noise, written in chunks so memory stays bounded.
+    #drop_every > 0 removes one packet in every drop_every to create gaps.
+    if start is None:
+        start = datetime.datetime(2019, 5, 19, 4, 50, 14, tzinfo=datetime.timezone.utc)
+    rng = np.random.default_rng(seed)
+    num_pkts = int(duration * RRI_SAMP_RATE / SAMPS_PER_PACKET)
+    pkt_nums = np.arange(1, num_pkts + 1, dtype=np.int64)
+    if drop_every > 0:
+        pkt_nums = pkt_nums[(pkt_nums % drop_every) != 0]
+    num_rows = len(pkt_nums)
+
+    with h5py.File(fp, 'w') as h5:
+        rd = h5.create_group('RRI Data')
+        ds = [rd.create_dataset('Radio Data Monopole {:d} (mV)'.format(m), shape=(num_rows, SAMPS_PER_PACKET),
+                                dtype=np.float64, chunks=(min(1024, max(1, num_rows)), SAMPS_PER_PACKET))
+              for m in range(1, 5)]
+        rd.create_dataset('RRI Packet Numbers', data=pkt_nums)
+        for i in range(0, num_rows, chunk_packets):
+            j = min(i + chunk_packets, num_rows)
+            #sample index of every sample in the chunk, from the packet numbers
+            n = (pkt_nums[i:j,None] - 1) * SAMPS_PER_PACKET + np.arange(SAMPS_PER_PACKET)[None,:]
+            phase = 2 * np.pi * tone_hz * n / RRI_SAMP_RATE
+            for m, d in enumerate(ds):
+                x = amplitude_mv * np.cos(phase - m * np.pi / 2) + noise_mv * rng.standard_normal(n.shape)
+                if nan_fraction > 0:
+                    x[rng.random(n.shape) < nan_fraction] = np.nan
+                d[i:j] = x
+
+        rs = h5.create_group('RRI Settings')
+        rs.create_dataset('Antenna Configuration', data=np.array([antenna.encode('utf-8')]))
+        rs.create_dataset('Data Format', data=np.array([data_format.encode('utf-8')]))
+        for m in range(1, 5):
+            rs.create_dataset('Antenna {:d} Gain'.format(m), data=np.array([b'High']))
+        for ch in ['A', 'B']:
+            rs.create_dataset('Start Frequency {:s} (Hz)'.format(ch), data=np.array([10.0e6]))
+            rs.create_dataset('Bandwidth {:s} (kHz)'.format(ch), data=np.array([62.5]))
+
+        #1 Hz ephemeris, circular 400 km orbit at 81 deg inclination
+        ce = h5.create_group('CASSIOPE Ephemeris')
+        t = np.arange(int(np.ceil(duration)) + 1, dtype=np.float64)
+        met0 = start.timestamp() - MET_EPOCH.timestamp()
+        u = 2 * np.pi * t / 5580.0
+        inc = np.deg2rad(81.0)
+        lat = np.rad2deg(np.arcsin(np.sin(inc) * np.sin(u)))
+        lon = np.rad2deg(np.arctan2(np.cos(inc) * np.sin(u), np.cos(u)))
+        lon = np.mod(lon - 0.25 * t / 60.0 + 180.0, 360.0) - 180.0
+        ce.create_dataset('Ephemeris MET (seconds since May 24, 1968)', data=met0 + t)
+        ce.create_dataset('Geographic Latitude (deg)', data=lat)
+        ce.create_dataset('Geographic Longitude (deg)', data=lon)
+        ce.create_dataset('Altitude (km)', data=400.0 + 5.0 * np.sin(2 * u))
+        ce.create_dataset('Roll (deg)', data=0.5 * np.sin(t / 60.0))
+        ce.create_dataset('Pitch (deg)', data=0.5 * np.cos(t / 60.0))
+        ce.create_dataset('Yaw (deg)', data=np.mod(t * 0.1, 360.0))
+        ce.create_dataset('GEI Position (km)', data=np.column_stack([np.cos(u), np.sin(u), np.zeros_like(u)]) * 6771.0)
+    return num_rows
+
+if __name__ == '__main__':
+    #--------START Command Line option parser------------------------------------------------------
+    parser = argparse.ArgumentParser(description="Synthetic RRI HDF5 Generator",
+                                     formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument("--duration", dest="duration", type=float, default=60.0,
+                        help="Pass duration [sec]", action="store")
+    parser.add_argument("--out_path", dest="out_path", type=str, default=os.getcwd(),
+                        help="Output directory", action="store")
+    parser.add_argument("--antenna", dest="antenna", type=str, default="Dipole",
+                        help="Antenna Configuration, Dipole or Monopole", action="store")
+    parser.add_argument("--format", dest="data_format", type=str, default="I1Q1I3Q3",
+                        help="Data Format, I1Q1I3Q3 or I1I2I3I4", action="store")
+    parser.add_argument("--drop_every", dest="drop_every", type=int, default=0,
+                        help="Drop one packet in every N, 0=no gaps", action="store")
+    parser.add_argument("--nan_fraction", dest="nan_fraction", type=float, default=0.0,
+                        help="Fraction of samples set to NaN", action="store")
+    parser.add_argument("--seed", dest="seed", type=int, default=0,
+                        help="Random seed", action="store")
+    args = parser.parse_args()
+    #--------END Command Line option parser------------------------------------------------------
+    fp = '/'.join([args.out_path, synthetic_filename(datetime.datetime(2019, 5, 19, 4, 50, 14, tzinfo=datetime.timezone.utc), args.duration)])
+    rows = write_synthetic_rri(fp, args.duration, antenna=args.antenna, data_format=args.data_format,
+                               drop_every=args.drop_every, nan_fraction=args.nan_fraction, seed=args.seed)
+    print("Wrote {:d} packets, {:.1f} MB: {:s}".format(rows, os.path.getsize(fp)/1e6, fp))
+    sys.exit()
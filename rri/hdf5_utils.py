@@ -17,14 +17,68 @@ import warnings
 import datetime
 from datetime import timedelta
 import pytz
-import pandas as pd
 import numpy as np
 import json
 import yaml
 import h5py
+import concurrent.futures
+from collections.abc import MutableMapping
+
+import cache_utils as cache
+import config_utils as config
+import ephem_utils as ephem
+import profile_utils as profile
+import quality_utils as quality
 
 if sys.version_info.major == 3:
     unicode = str
+
+SAMPS_PER_PACKET = 29
+CHANNELS = ['A', 'B']
+MONOPOLE_KEYS = ['Radio Data Monopole {:d} (mV)'.format(k) for k in range(1, 5)]
+#quantized output datatypes and full scale count
+QUANT_DATATYPES = {'cf32_le': 'ci16_le', 'rf32_le': 'ri16_le'}
+QUANT_FULL_SCALE = 32767
+
+def _demux_stream(name, mode, pos, neg, band, gains):
+    return {'name': name, 'mode': mode, 'pos': pos, 'neg': neg, 'band': band, 'gains': gains,
+            'datatype': 'rf32_le' if mode == 'real' else 'cf32_le'}
+
+#Demux table, (Antenna Configuration, Data Format, mono_to_di) -> output
+#streams, a mono_to_di of None matches either setting.  Each stream is built
+#from monopole datasets pos/neg (1-4) by its mode:
+#   iq   : I = pos, Q = neg          cf32_le
+#   diff : I = pos - neg, Q = 0      cf32_le, monopole pair -> dipole
+#   real : pos                       rf32_le
+#band selects the Start Frequency/Bandwidth A or B setting, gains the
+#antenna gains recorded in the stream's global metadata.
+DIPOLE_STREAMS = [_demux_stream('A', 'iq', 1, 2, 'A', [1, 2]),
+                  _demux_stream('B', 'iq', 3, 4, 'B', [3, 4])]
+DEMUX_TABLE = {
+    ('Dipole',   'I1Q1I3Q3', None) : DIPOLE_STREAMS,
+    ('Dipole',   'I1I2I3I4', None) : DIPOLE_STREAMS,
+    ('Monopole', 'I1Q1I3Q3', None) : [_demux_stream('A', 'iq', 1, 2, 'A', [1]),
+                                      _demux_stream('B', 'iq', 3, 4, 'B', [3])],
+    ('Monopole', 'I1I2I3I4', True) : [_demux_stream('A', 'diff', 1, 2, 'A', [1, 2]),
+                                      _demux_stream('B', 'diff', 3, 4, 'B', [3, 4])],
+    ('Monopole', 'I1I2I3I4', False): [_demux_stream('1', 'real', 1, None, 'A', [1]),
+                                      _demux_stream('2', 'real', 2, None, 'A', [2]),
+                                      _demux_stream('3', 'real', 3, None, 'B', [3]),
+                                      _demux_stream('4', 'real', 4, None, 'B', [4])],
+}
+
+def stream_antennas(stream):
+    #monopole datasets (1-4) a stream is built from
+    return [ant for ant in (stream['pos'], stream['neg']) if ant is not None]
+
+def demux_streams(settings, mono_to_di):
+    #Output streams for the RRI Settings of a file, None if unsupported
+    ant = settings['Antenna Configuration']
+    fmt = settings['Data Format']
+    for key in [(ant, fmt, bool(mono_to_di)), (ant, fmt, None)]:
+        if key in DEMUX_TABLE:
+            return DEMUX_TABLE[key]
+    return None
 #
 # def import_h5(cfg):
 #     print("Importing RRI Data...")
@@ -43,7 +97,9 @@ class HDF5_SigMF_Converter(object):
     """
     #def __init__(self, h5_data=None):
     def __init__(self, cfg):
-        self.cfg = cfg
+        #options added since the original configuration file default to the
+        #shipped config/config.yaml values when they are missing
+        self.cfg = config.apply_defaults(cfg)
         self.h5_data = None
         self.metadata = None
         self.radio_data = None
@@ -51,28 +107,55 @@ class HDF5_SigMF_Converter(object):
         self.verbose     = self.cfg['main']['verbose']
         self.export_iq   = self.cfg['main']['export']['iq']
         self.export_meta = self.cfg['main']['export']['meta']
+        self.stream      = self.cfg['main']['stream']['enable']
+        self.threads     = self.cfg['main']['threads']
+        self.meta_cache  = self.cfg['meta_cache']['enable']
+        self.lazy_meta   = self.cfg['main']['lazy_meta']
+        self.quantize    = self.cfg['main']['quantize']['enable']
 
-        try:
-            self._import_h5()
-        except Exception as e:
-            print(e)
-            return 0
+        #opt-in per stage wall time, bytes and peak memory
+        self.profiler = profile.Stage_Profiler(self._get_rri_filepath(),
+                                               self.cfg['main']['profile']['enable'],
+                                               self.cfg['main']['profile']['tracemalloc'])
 
-        self._gen_sigmf_filename()
+        #with a current metadata cache the HDF5 file is only opened when
+        #radio data is actually needed
+        self.cached_metadata = None
+        if self.meta_cache:
+            with self.profiler.stage('load_meta_cache'):
+                self.cached_metadata = cache.load_metadata_cache(self._get_rri_filepath(),
+                                                                 self.cfg['meta_cache']['dir'],
+                                                                 self.verbose)
+        if self.cached_metadata is None:
+            try:
+                self._import_h5()
+            except Exception as e:
+                print(e)
+                return 0
 
         self.RRI_SAMP_RATE_REAL    = 1.0 / 62500.33933
         self.RRI_SAMP_RATE_COMPLEX = self.RRI_SAMP_RATE_REAL / 2
         self.rd = []
+        self.stage_buf = None
+        self.radio_ds = None
+        self.window = utc_window(self.cfg)
+        self.rows = None
+        self.quant = None
+        self.quality = None
+
+    def _get_rri_filepath(self):
+        return '/'.join([self.cfg['main']['rri_path'],
+                         self.cfg['main']['rri_file']])
 
     def _import_h5(self):
         if self.verbose: print("Importing RRI Data...")
-        rri_fp = '/'.join([self.cfg['main']['rri_path'],
-                           self.cfg['main']['rri_file']])
+        rri_fp = self._get_rri_filepath()
         if self.verbose: print("Import Filepath: {:s}".format(rri_fp))
         if not os.path.exists(rri_fp) == True:
             if self.verbose: print('  ERROR: RRI file or path does not exist: {:s}'.format(rri_fp))
             sys.exit()
-        h5 = h5py.File(rri_fp, 'r')
+        with self.profiler.stage('import_h5'):
+            h5 = h5py.File(rri_fp, 'r', **h5_file_options(self.cfg))
         self.h5_data = h5
         if self.verbose: print("RRI Data Import Complete")
 
@@ -157,17 +240,25 @@ class HDF5_SigMF_Converter(object):
 
         return att_dict
 
+    def _clean_value(self, val):
+        #numpy scalars to python types and string arrays to lists of str,
+        #numeric arrays are left as numpy arrays
+        if isinstance(val, np.ndarray) and val.dtype.kind in 'SUO':
+            return [x.decode('utf-8') if isinstance(x, bytes) else str(x) for x in val.tolist()]
+        if isinstance(val, np.bool_):
+            return bool(val)
+        if isinstance(val, np.integer):
+            return int(val)
+        if isinstance(val, np.floating):
+            return float(val)
+        return val
+
     def _clean_attributes(self, metadata):
         attrs_to_delete = []
         for key, val in metadata.items():
-            if type(val) in [np.uint16, np.uint8, np.uint, np.uint32, np.int, np.int16, np.int32, np.int64]:
-                metadata[key] = int(val)
-            if type(val) in [np.float, np.float16, np.float32, np.float64]:
-                metadata[key] = float(val)
-            if type(val) in [np.bool, np.bool_]:
-                metadata[key] = bool(val)
-            if isinstance(val, np.ndarray):
-                metadata[key] = val.tolist()
+            metadata[key] = self._clean_value(val)
+            if isinstance(metadata[key], np.ndarray):
+                metadata[key] = metadata[key].tolist()
             if isinstance(val, h5py.Reference):
                 attrs_to_delete.append(key)
 
@@ -210,128 +301,431 @@ class HDF5_SigMF_Converter(object):
         return metadata_tree
 
     def _generate_utc_time(self):
-        ts_key = 'Ephemeris MET (seconds since May 24, 1968)'
-        met_epoch = datetime.datetime(1968, 5, 24, 0, 0, 0)
-        met_epoch = met_epoch.replace(tzinfo=datetime.timezone.utc)
-        utc_epoch = datetime.datetime(1970, 1, 1, 0, 0, 0)
-        utc_epoch = utc_epoch.replace(tzinfo=datetime.timezone.utc)
-        epoch_delta = utc_epoch.timestamp() - met_epoch.timestamp()
-        met = np.array(self.metadata['CASSIOPE Ephemeris'][ts_key])
-        utc = met - epoch_delta
-        self.metadata['CASSIOPE Ephemeris']['Ephemeris UTC [sec]'] = utc.tolist()
+        #Columnar ephemeris (numpy columns, float64 UTC seconds and
+        #datetime64[ns]) shared by every consumer of the converter
+        self.ephem = ephem.RRI_Ephemeris.from_metadata(self.metadata['CASSIOPE Ephemeris'])
+        self.metadata['CASSIOPE Ephemeris'][ephem.UTC_KEY] = self.ephem.utc
+
+    def get_ephemeris(self, start=None, stop=None):
+        if start is None and stop is None:
+            return self.ephem
+        return self.ephem.select(start, stop)
 
     def _update_metadata(self, parent):
+        if self.lazy_meta:
+            #groups and datasets are only read when first accessed
+            self.metadata = HDF5_Lazy_Metadata(self, parent, top=True)
+            return
         metadata = self._get_attrs_from_groups(parent)
         metadata = self._clean_attributes(metadata)
         # metadata = self._remove_sigmf_fps['dipole1']radio_data(metadata)
         self.metadata = metadata
 
     def get_metadata(self, h5_data=None):
+        with self.profiler.stage('get_metadata'):
+            return self._get_metadata(h5_data)
+
+    def _get_metadata(self, h5_data=None):
         if self.verbose: print('Generating Metadata From HDF5 Data...')
         if h5_data != None:
             if self.verbose: print("updating converter HDF5 Data")
             self.h5_data = h5_data
-        self._update_metadata(self.h5_data)
+            self.cached_metadata = None
+        if self.cached_metadata is not None:
+            self.metadata = self.cached_metadata
+        else:
+            if self.h5_data is None: self._import_h5()
+            self._update_metadata(self.h5_data)
+            if self.meta_cache:
+                metadata = self.metadata
+                if isinstance(metadata, HDF5_Lazy_Metadata):
+                    metadata = metadata.to_dict()
+                cache.save_metadata_cache(self._get_rri_filepath(), metadata,
+                                          self.cfg['meta_cache']['dir'], self.verbose)
         self._generate_utc_time()
         return self.metadata
 
-    def get_radio_iq(self):
+    def get_radio_iq(self, files=None):
+        #files: already open per stream files to append to instead of this
+        #file's own SigMF data files (pass concatenation), left open
+        with self.profiler.stage('get_radio_iq'):
+            self._get_radio_iq(files)
+
+    def _get_radio_iq(self, files=None):
         if self.verbose: print("Extracting and Converting IQ...")
+        self.get_radio_data()
+        if self.verbose: print(self.metadata['RRI Settings'])
+        self._select_rows()
+        self._set_streams()
+        if self.cfg['quality']['enable']:
+            #per packet statistics, taken from the blocks as they are read
+            self.quality = quality.Packet_Quality(self.cfg['quality'], *self.rows)
+
+        #the stream conversions/writes run in parallel worker threads, numpy
+        #and file I/O release the GIL
+        self.pool = None
+        if self.threads:
+            self.pool = concurrent.futures.ThreadPoolExecutor(max_workers=len(self.streams))
+        own_files = files is None
+        if own_files:
+            files = self._open_iq_files()
+        try:
+            if self.stream:
+                self._stream_radio_iq(files)
+            else:
+                #extract samples from HDF5 fields
+                self.rd1, self.rd2, self.rd3, self.rd4 = self._read_radio_block(*self.rows)
+                self.samp_count = len(self.rd1)
+                rd = (self.rd1, self.rd2, self.rd3, self.rd4)
+                if self.quantize:
+                    #the converted samples set the scale of each stream
+                    #before anything is written
+                    iqs = self._submit_streams(rd, {})()
+                    self._set_quant_scales({name: self._peak(iq) for name, iq in zip(self.stream_names, iqs)})
+                    self._submit_writes(dict(zip(self.stream_names, iqs)), files)()
+                else:
+                    iqs = self._submit_streams(rd, files)()
+                self.iq = dict(zip(self.stream_names, iqs))
+            if self.quantize:
+                self._quant_report()
+            if self.quality is not None:
+                self._quality_report()
+        finally:
+            if own_files:
+                for f in files.values():
+                    f.close()
+            if self.pool is not None:
+                self.pool.shutdown()
+                self.pool = None
+
+    def get_radio_data(self):
+        #RRI Data group, the HDF5 file is only opened here when the metadata
+        #was loaded from the cache
+        if self.h5_data is None: self._import_h5()
         self.rd = self.h5_data["RRI Data"]
-        #extract samples from HDF5 fields
-        self.rd1 = np.array(self.rd['Radio Data Monopole 1 (mV)'], dtype=np.single)
-        self.rd2 = np.array(self.rd['Radio Data Monopole 2 (mV)'], dtype=np.single)
-        self.rd3 = np.array(self.rd['Radio Data Monopole 3 (mV)'], dtype=np.single)
-        self.rd4 = np.array(self.rd['Radio Data Monopole 4 (mV)'], dtype=np.single)
-        #convert NaN to 0
-        self.rd1[np.isnan(self.rd1)] = 0
-        self.rd2[np.isnan(self.rd2)] = 0
-        self.rd3[np.isnan(self.rd3)] = 0
-        self.rd4[np.isnan(self.rd4)] = 0
-        #convert 4x29 samps to single continuous dataset
-        self.rd1 = np.hstack(self.rd1)
-        self.rd2 = np.hstack(self.rd2)
-        self.rd3 = np.hstack(self.rd3)
-        self.rd4 = np.hstack(self.rd4)
-
-        print(self.metadata['RRI Settings'])
-
-        if self.metadata['RRI Settings']['Antenna Configuration'] == 'Dipole':
-            if self.verbose: print("Extracting Dipole IQ Data...")
-            #Antenna set to dipole mode, expect I1Q1I3Q3 for Data Format
-            #This explixitly assumes there are two output files....future versions
-            #may need to account for possibility of up to 4 output files of with different formats.
-            if self.metadata['RRI Settings']['Data Format'] == "I1Q1I3Q3":
-                #Convert to complex IQ datadtype
-                self.iq1 = np.vectorize(complex)(self.rd1,self.rd2).astype(dtype=np.csingle)
-                self.iq2 = np.vectorize(complex)(self.rd3,self.rd4).astype(dtype=np.csingle)
-            if self.metadata['RRI Settings']['Data Format'] == "I1I2I3I4":
-                #Convert to complex IQ datatype
-                # This one seems to be right
-                self.iq1 = np.vectorize(complex)(self.rd1,self.rd2).astype(dtype=np.csingle)
-                self.iq2 = np.vectorize(complex)(self.rd3,self.rd4).astype(dtype=np.csingle)
-
-                #This one seems to be slightly wrong:
-                #keeping the code commented out as reminder to Future Zach
-                # self.iq1 = np.vectorize(complex)(self.rd1,0).astype(dtype=np.csingle)
-                # self.iq2 = np.vectorize(complex)(self.rd3,0).astype(dtype=np.csingle)
-
-
-        elif self.metadata['RRI Settings']['Antenna Configuration'] == 'Monopole':
-            if self.verbose: print("Extracting Monopole IQ Data...")
-            if self.cfg['main']['mono_to_di']:
-                if self.verbose: print("Converting Monopole Data to Dipole Data")
-                #Monopoles 1 & 2 -> Dipole 1 -> Channel A
-                #Monopoles 3 & 4 -> Dipole 2 -> Channel B
-                dpA = self.rd1-self.rd2
-                dpB = self.rd3-self.rd4
-
-                self.iq1 = np.vectorize(complex)(dpA,0).astype(dtype=np.csingle)
-                self.iq2 = np.vectorize(complex)(dpB,0).astype(dtype=np.csingle)
-        else:
-            print("WARNING: Unknown Antenna Configuration!")
+        return self.rd
+
+    def _open_iq_files(self):
+        #each stream file is opened once and written from its worker
+        files = {}
+        if not self.export_iq:
+            if self.verbose: print("IQ Data Export set to FALSE...")
+            return files
+        if self.verbose: print("Writing IQ to file...")
+        for name in self.stream_names:
+            if self.verbose:
+                print("Writing Channel {:s} File: {:s}".format(name, self.sigmf_fps[name]['data']))
+            files[name] = open(self.sigmf_fps[name]['data'], 'wb')
+        return files
+
+    def _select_rows(self):
+        #Packet timeline of the file and the packet rows [row_start:row_stop]
+        #that overlap the configured UTC window (all rows without a window).
+        #The window is applied at packet granularity, the recording starts at
+        #the first sample of the first packet ending after the window start.
+        if self.rows is not None:
+            return self.rows
+        self.pkt_nums = np.asarray(self.rd['RRI Packet Numbers'][:], dtype=np.int64)
+        starts, stops, elapsed = find_packet_segments(self.pkt_nums)
+        #UTC of the first sample of every packet row
+        self.row_utc = self.ephem.start + elapsed * SAMPS_PER_PACKET * self.RRI_SAMP_RATE_REAL
+        row_start, row_stop = 0, len(self.pkt_nums)
+        start, stop = self.window
+        if start is not None:
+            row_end_utc = self.row_utc + SAMPS_PER_PACKET * self.RRI_SAMP_RATE_REAL
+            row_start = int(np.searchsorted(row_end_utc, start, side='right'))
+        if stop is not None:
+            row_stop = int(np.searchsorted(self.row_utc, stop, side='left'))
+        if row_stop <= row_start:
+            print("WARNING: UTC window contains no RRI packets: {:} to {:}".format(*self.cfg['main']['window'].values()))
+            print("  RRI data spans: {:} to {:}".format(utc_isoformat(self.row_utc[0]), utc_isoformat(self.row_utc[-1])))
+            sys.exit()
+        if start is not None or stop is not None:
+            print("UTC window: packet rows {:d} to {:d} of {:d}, {:s} to {:s}".format(
+                row_start, row_stop, len(self.pkt_nums), utc_isoformat(self.row_utc[row_start]),
+                utc_isoformat(self.row_utc[row_stop - 1] + SAMPS_PER_PACKET * self.RRI_SAMP_RATE_REAL)))
+        self.rows = (row_start, row_stop)
+        return self.rows
+
+    def _set_streams(self):
+        #Look up the output streams for this antenna configuration and data
+        #format, then name the SigMF files after them
+        self.streams = demux_streams(self.metadata['RRI Settings'], self.cfg['main']['mono_to_di'])
+        if self.streams is None:
+            print("WARNING: Unsupported Antenna Configuration / Data Format!")
             print(self.metadata['RRI Settings'])
             sys.exit()
+        self.stream_names = [stream['name'] for stream in self.streams]
+        self._gen_sigmf_filename()
 
-        if self.export_iq:
-            if self.verbose:
-                print("Writing IQ to file...")
-                print("Writing Channel A File: {:s}".format(self.sigmf_fps['A']['data']))
-            with open(self.sigmf_fps['A']['data'], 'w') as f:
-                self.iq1.tofile(f, sep="")
-                f.close()
-            if self.verbose:
-                print("Writing Channel B File: {:s}".format(self.sigmf_fps['B']['data']))
-            with open(self.sigmf_fps['B']['data'], 'w') as f:
-                self.iq2.tofile(f, sep="")
-                f.close()
+    def _radio_datasets(self):
+        #Handles, shape, dtype and chunk rows of the four monopole datasets,
+        #looked up once per RRI Data group instead of on every block
+        if self.radio_ds is None or self.radio_ds['group'] is not self.rd:
+            dsets = [self.rd[key] for key in MONOPOLE_KEYS]
+            chunks = dsets[0].chunks
+            self.radio_ds = {
+                'group'     : self.rd,
+                'ids'       : [ds.id for ds in dsets],
+                'shape'     : dsets[0].shape,
+                'dtype'     : dsets[0].dtype,
+                'chunk_rows': 1 if chunks is None else chunks[0],
+            }
+        return self.radio_ds
+
+    def _read_radio_block(self, start=None, stop=None, out=None):
+        #Read rows [start:stop] of the four monopole datasets (one row per
+        #29 sample packet) into float32 buffers, out is an optional list of
+        #four preallocated (rows, 29) float32 buffers.  The NaNs are zeroed,
+        #after the packet quality statistics are taken when enabled, and each
+        #block is flattened to continuous samples.
+        radio = self._radio_datasets()
+        start, stop, _ = slice(start, stop).indices(radio['shape'][0])
+        count = max(stop - start, 0)
+        rd = []
+        with self.profiler.stage('read'):
+            for k, dsid in enumerate(radio['ids']):
+                if out is None:
+                    buf = np.empty((count, radio['shape'][1]), dtype=np.single)
+                else:
+                    buf = out[k][:count]
+                self._read_direct(dsid, radio['dtype'], start, stop, buf)
+                rd.append(buf)
+        #bytes as stored in the file, not the float32 copies
+        self.profiler.add_io('read', read=4 * rd[0].size * radio['dtype'].itemsize)
+        if self.quality is not None:
+            with self.profiler.stage('quality'):
+                self.quality.update(start, rd)
         else:
-            if self.verbose: print("IQ Data Export set to FALSE...")
+            for buf in rd:
+                #convert NaN to 0
+                buf[np.isnan(buf)] = 0
+        #convert Nx29 samps to single continuous dataset
+        return tuple(buf.ravel() for buf in rd)
+
+    def _read_direct(self, dsid, dtype, start, stop, buf):
+        #Read whole chunk aligned slabs of rows into a reused staging buffer
+        #of the dataset's own dtype, a plain copy inside HDF5 that is faster
+        #than its float64 -> float32 conversion path, then convert the slab
+        #into buf with numpy.  The float64 copy is bounded by the slab.  The
+        #slabs go through the low level read that Dataset.read_direct wraps,
+        #with one reused file dataspace instead of per call selections.
+        slab = self._aligned_block(int(self.cfg['h5']['slab_packets']))
+        if dtype == buf.dtype:
+            stage_buf = buf
+        else:
+            if self.stage_buf is None or self.stage_buf.shape != (slab, buf.shape[1]) or self.stage_buf.dtype != dtype:
+                self.stage_buf = np.empty((slab, buf.shape[1]), dtype=dtype)
+            stage_buf = self.stage_buf
+        fspace = dsid.get_space()
+        for i in range(start, stop, slab):
+            j = min(i + slab, stop)
+            stage = stage_buf[i - start:j - start] if stage_buf is buf else stage_buf[:j - i]
+            fspace.select_hyperslab((i, 0), stage.shape)
+            dsid.read(h5py.h5s.create_simple(stage.shape), fspace, stage)
+            if stage_buf is not buf:
+                buf[i - start:j - start] = stage
+
+    def _aligned_block(self, block):
+        #Round a block of packet rows up to whole on-disk chunks, so no chunk
+        #is read (and decompressed) again by the next block
+        chunk_rows = self._radio_datasets()['chunk_rows']
+        return -(-block // chunk_rows) * chunk_rows
+
+    def _convert_radio_block(self, rd1, rd2, rd3, rd4):
+        if not hasattr(self, 'streams'): self._set_streams()
+        return tuple(self._convert_stream(stream, (rd1, rd2, rd3, rd4)) for stream in self.streams)
+
+    def _convert_stream(self, stream, rd, out=None):
+        #Build one output stream from the four monopole sample arrays
+        pos = rd[stream['pos'] - 1]
+        if stream['mode'] == 'real':
+            #written as is, rf32_le
+            return pos
+        if stream['mode'] == 'iq':
+            return self._interleave_iq(pos, rd[stream['neg'] - 1], out)
+        #monopole pair -> equivalent dipole, the difference is taken in
+        #place on the real part of the output
+        iq = self._interleave_iq(pos, None, out)
+        iq.real -= rd[stream['neg'] - 1]
+        return iq
+
+    def _interleave_iq(self, i_samps, q_samps=None, out=None):
+        #Write I and Q straight into a preallocated interleaved float32 buffer
+        #and reinterpret it as complex64, no per sample python complex objects
+        if out is None:
+            buf = np.empty((len(i_samps), 2), dtype=np.single)
+        else:
+            buf = out[:len(i_samps)]
+        buf[:,0] = i_samps
+        if q_samps is None:
+            buf[:,1] = 0
+        else:
+            buf[:,1] = q_samps
+        return buf.view(np.csingle).ravel()
+
+    def _stream_work(self, stream, rd, files, bufs):
+        #with threads the convert/write stage times are summed over all
+        #stream workers, so they can exceed the wall time of get_radio_iq
+        name = stream['name']
+        with self.profiler.stage('convert'):
+            iq = self._convert_stream(stream, rd, out=None if bufs is None else bufs.get(name))
+        if name in files:
+            self._write_stream(name, iq, files[name])
+        return iq
+
+    def _write_stream(self, name, iq, f):
+        if self.quant is not None:
+            with self.profiler.stage('quantize'):
+                iq = self._quantize(name, iq)
+        with self.profiler.stage('write'):
+            iq.tofile(f)
+        self.profiler.add_io('write', written=iq.nbytes)
+
+    def _submit_writes(self, iqs, files):
+        #Write already converted streams, returns a callable that waits
+        names = [name for name in self.stream_names if name in files]
+        if self.pool is None:
+            for name in names:
+                self._write_stream(name, iqs[name], files[name])
+            return lambda: None
+        futures = [self.pool.submit(self._write_stream, name, iqs[name], files[name]) for name in names]
+        return lambda: [f.result() for f in futures]
+
+    def _peak(self, iq):
+        #largest magnitude of any I, Q or real value
+        x = iq.view(np.single)
+        if len(x) == 0:
+            return 0.0
+        return float(max(x.max(), -x.min()))
+
+    def _set_quant_scales(self, peaks):
+        #counts per mV of each stream, its peak maps to full scale
+        self.quant = {}
+        for name in self.stream_names:
+            peak = peaks[name]
+            self.quant[name] = {
+                'scale'  : QUANT_FULL_SCALE / peak if peak > 0 else 1.0,
+                'peak'   : peak,
+                'count'  : 0,
+                'sq_err' : 0.0,
+                'sq_sig' : 0.0,
+                'max_err': 0.0,
+            }
+
+    def _quantize(self, name, iq):
+        #float32 samples -> int16 counts at the stream's scale, I/Q stay
+        #interleaved.  The error against the float32 samples is accumulated
+        #for the quantization report, each stream is only ever quantized by
+        #one worker at a time.
+        q = self.quant[name]
+        x = iq.view(np.single)
+        y = np.rint(x * np.single(q['scale']))
+        err = y / np.single(q['scale']) - x
+        if len(x) > 0:
+            q['count'] += len(x)
+            q['sq_err'] += float(np.dot(err, err))
+            q['sq_sig'] += float(np.dot(x, x))
+            q['max_err'] = max(q['max_err'], float(np.abs(err).max()))
+        return y.astype(np.int16)
+
+    def _quant_report(self):
+        print("----------Quantization Report----------------------")
+        for name in self.stream_names:
+            q = self.quant[name]
+            q['rms_error'] = np.sqrt(q['sq_err'] / q['count']) if q['count'] > 0 else None
+            q['sqnr_db'] = None
+            if q['sq_err'] > 0:
+                q['sqnr_db'] = 10.0 * np.log10(q['sq_sig'] / q['sq_err'])
+            print("Channel {:s}: {:.6g} mV/count, peak {:.3f} mV".format(name, 1.0 / q['scale'], q['peak']))
+            if q['rms_error'] is not None:
+                print("  RMS error: {:.3g} mV, max error: {:.3g} mV, SQNR: {:} dB".format(
+                    q['rms_error'], q['max_err'],
+                    "inf" if q['sqnr_db'] is None else "{:.2f}".format(q['sqnr_db'])))
+
+    def _quality_report(self):
+        print("----------Data Quality Report----------------------")
+        for stream in self.streams:
+            self.quality.report(stream['name'], stream_antennas(stream))
+
+    def _submit_streams(self, rd, files, bufs=None):
+        #Convert and write every stream of one block, returns a callable
+        #that waits for the streams and returns their samples
+        if self.pool is None:
+            results = [self._stream_work(stream, rd, files, bufs) for stream in self.streams]
+            return lambda: results
+        futures = [self.pool.submit(self._stream_work, stream, rd, files, bufs) for stream in self.streams]
+        return lambda: [f.result() for f in futures]
+
+    def _stream_radio_iq(self, files):
+        #Read the monopole datasets in blocks of packet rows and append each
+        #converted block to the channel A/B files, peak memory is set by
+        #block_packets rather than by the length of the pass
+        row_start, row_stop = self.rows
+        block = int(self.cfg['main']['stream']['block_packets'])
+        if block < 1:
+            print("WARNING: Invalid stream block_packets: {:d}".format(block))
+            sys.exit()
+        block = self._aligned_block(block)
+        if self.verbose:
+            print("Streaming IQ in blocks of {:d} packets ({:d} packets total)...".format(block, row_stop - row_start))
+        #preallocated per stream complex output buffers, reused for every
+        #block, real streams are written straight from the read block
+        bufs = {stream['name']: np.empty((block * SAMPS_PER_PACKET, 2), dtype=np.single)
+                for stream in self.streams if stream['mode'] != 'real'}
+        #two sets of read buffers, the next block is read into one while the
+        #previous block is converted/written from the other
+        read_bufs = [[np.empty((block, SAMPS_PER_PACKET), dtype=np.single) for key in MONOPOLE_KEYS]
+                     for i in range(2)]
+        #after the first block, blocks start on chunk aligned rows
+        starts = [row_start] + list(range((row_start // block + 1) * block, row_stop, block))
+        blocks = [(start, min((start // block + 1) * block, row_stop)) for start in starts]
+        if self.quantize:
+            #first pass, the peak of every converted stream sets its scale
+            peaks = dict.fromkeys(self.stream_names, 0.0)
+            for start, stop in blocks:
+                rd = self._read_radio_block(start, stop, read_bufs[0])
+                for name, iq in zip(self.stream_names, self._submit_streams(rd, {}, bufs)()):
+                    peaks[name] = max(peaks[name], self._peak(iq))
+            self._set_quant_scales(peaks)
+        self.samp_count = 0
+        pending = None
+        for i, (start, stop) in enumerate(blocks):
+            rd = self._read_radio_block(start, stop, read_bufs[i % 2])
+            if pending is not None: pending()
+            pending = self._submit_streams(rd, files, bufs)
+            self.samp_count += len(rd[0])
+        if pending is not None: pending()
 
     def get_radio_meta(self):
+        with self.profiler.stage('get_radio_meta'):
+            self._get_radio_meta()
+
+    def _get_radio_meta(self):
         if self.verbose:
             print()
             print("----------Processing Metadata----------------------")
             print("---- CASSIOPE Metadata ---------")
-        utc_min = self.metadata['CASSIOPE Ephemeris']['Ephemeris UTC [sec]'][0]
-        utc_max = self.metadata['CASSIOPE Ephemeris']['Ephemeris UTC [sec]'][-1]
+        utc_min = self.ephem.start
+        utc_max = self.ephem.stop
         dt_min = datetime.datetime.fromtimestamp(utc_min, tz=pytz.UTC)
         dt_max = datetime.datetime.fromtimestamp(utc_max, tz=pytz.UTC)
         utc_dur = utc_max - utc_min
 
-        rri_pkt_idx_min = min(self.rd['RRI Packet Numbers'])
-        rri_pkt_idx_max = max(self.rd['RRI Packet Numbers'])
-        print("RRI Packet Number:", rri_pkt_idx_min, rri_pkt_idx_max)
-        samps_per_packet = 29
+        self._select_rows()
+        rri_pkt_idx_min = self.pkt_nums.min()
+        rri_pkt_idx_max = self.pkt_nums.max()
+        if self.verbose: print("RRI Packet Number:", rri_pkt_idx_min, rri_pkt_idx_max)
+        samps_per_packet = SAMPS_PER_PACKET
         sample_count = rri_pkt_idx_max * samps_per_packet
-        print("samp count:", sample_count)
+        if self.verbose: print("samp count:", sample_count)
         duration = self.RRI_SAMP_RATE_REAL * sample_count
-        print("  duration:", duration)
-        print("---- RRI Metadata SAMPLES---------")
-        samp_count = len(self.rd1)
-        print("samp count:", samp_count)
+        if self.verbose: print("  duration:", duration)
+        if self.verbose: print("---- RRI Metadata SAMPLES---------")
+        samp_count = self.samp_count
+        if self.verbose: print("samp count:", samp_count)
         samp_dur = self.RRI_SAMP_RATE_REAL * samp_count
-        print("  samp_dur:", samp_dur)
+        if self.verbose: print("  samp_dur:", samp_dur)
 
         if self.verbose:
             print("     Start [UTC]:", dt_min.isoformat().replace("+00:00","Z"))
@@ -348,122 +742,292 @@ class HDF5_SigMF_Converter(object):
             print("---- RRI Metadata SAMPLES---------")
             print("samp count:", samp_count)
             print("  samp_dur:", samp_dur)
+
+        self._gen_capture_segments()
         #Generate Sigmf File Names
         self._gen_sigmf_metadata()
 
-    def _gen_sigmf_metadata(self):
-        #Generate initial dict structure
-        self.dp1_sigmf_meta = copy.deepcopy(self.cfg['sigmf'])
-        self.dp2_sigmf_meta = copy.deepcopy(self.cfg['sigmf'])
+    def _gen_capture_segments(self):
+        #One SigMF capture per contiguous run of RRI packet numbers, so dropped
+        #packets restart the sample clock at the correct time
+        row_start, row_stop = self._select_rows()
+        pkt = self.pkt_nums[row_start:row_stop]
+        starts, stops, elapsed = find_packet_segments(pkt)
+        seg_utc = self.row_utc[row_start + starts]
+        dropped = np.zeros(len(starts), dtype=np.int64)
+        dropped[1:] = pkt[starts[1:]] - pkt[stops[:-1] - 1] - 1
 
-        temp = copy.deepcopy(self.cfg['sigmf']['captures'])
-        self.dp1_sigmf_meta['captures'] = []
-        self.dp1_sigmf_meta['captures'].append(temp)
-        self.dp2_sigmf_meta['captures'] = []
-        self.dp2_sigmf_meta['captures'].append(temp)
+        self.capture_utc = seg_utc
+        self.capture_segments = []
+        for i in range(len(starts)):
+            dt_seg = datetime.datetime.fromtimestamp(seg_utc[i], tz=pytz.UTC)
+            self.capture_segments.append({
+                'core:sample_start'  : int(starts[i]) * SAMPS_PER_PACKET,
+                'core:datetime'      : dt_seg.isoformat().replace("+00:00","Z"),
+                'rri:packet_start'   : int(pkt[starts[i]]),
+                'rri:packet_count'   : int(stops[i] - starts[i]),
+                'rri:dropped_packets': int(dropped[i]),
+            })
+        if self.verbose or len(starts) > 1:
+            print("RRI Packet Segments: {:d}, dropped packets: {:d}".format(len(starts), int(dropped.sum())))
 
-        utc_min = self.metadata['CASSIOPE Ephemeris']['Ephemeris UTC [sec]'][0]
-        dt_min = datetime.datetime.fromtimestamp(utc_min, tz=pytz.UTC)
+    def get_interpolator(self, keys=None):
+        #Sample index -> position/attitude, needs the capture segments from
+        #get_radio_meta
+        return ephem.Ephemeris_Interpolator(self.ephem,
+                                            [seg['core:sample_start'] for seg in self.capture_segments],
+                                            self.capture_utc,
+                                            self.RRI_SAMP_RATE_REAL,
+                                            keys)
+
+    def _gen_ephem_annotations(self):
+        interval = int(round(self.cfg['ephem_annotations']['interval_sec'] / self.RRI_SAMP_RATE_REAL))
+        if interval < 1:
+            print("WARNING: Invalid ephem_annotations interval_sec")
+            sys.exit()
+        return self.get_interpolator().annotations(self.samp_count, interval)
+
+    def _expand_captures(self, capture):
+        #Copy of the base capture for every packet segment, the first segment
+        #keeps the datetime already set from the ephemeris start
+        captures = []
+        for i, seg in enumerate(self.capture_segments):
+            temp = copy.deepcopy(capture)
+            temp.update(seg)
+            if i == 0: temp['core:datetime'] = capture['core:datetime']
+            if len(self.capture_segments) == 1:
+                for key in ['rri:packet_start', 'rri:packet_count', 'rri:dropped_packets']:
+                    del temp[key]
+            captures.append(temp)
+        return captures
+
+    def _gen_sigmf_metadata(self):
+        #One SigMF metadata dict per output stream, built from the stream's
+        #demux table entry
+        if not hasattr(self, 'streams'): self._set_streams()
+        settings = self.metadata['RRI Settings']
+        #first sample of the recording, the ephemeris start for a whole pass
+        dt_min = datetime.datetime.fromtimestamp(self.capture_utc[0], tz=pytz.UTC)
 
         if self.verbose:
             print("---- RRI Settings---------")
-            print(self.metadata['RRI Settings'])
+            print(settings)
 
-        if self.metadata['RRI Settings']['Antenna Configuration'] == 'Dipole':
-            #Antenna set to dipole mode, expect I1Q1I3Q3 for Data Format
-            #This explixitly assumes there are two output files....future versions
-            #may need to account for possibility of up to 4 output files of with different formats.
-            if self.metadata['RRI Settings']['Data Format'] == "I1Q1I3Q3":
-
-                #----DIPOLE 1-----------------------------
-                self.dp1_sigmf_meta['global']['rri:antenna_config'] = self.metadata['RRI Settings']['Antenna Configuration']
-                self.dp1_sigmf_meta['global']['rri:format'] = self.metadata['RRI Settings']['Data Format']
-                self.dp1_sigmf_meta['global']['rri:channel'] = "A"
-                self.dp1_sigmf_meta['global']['rri:antenna_1_gain'] = self.metadata['RRI Settings']['Antenna 1 Gain']
-                self.dp1_sigmf_meta['global']['rri:antenna_2_gain'] = self.metadata['RRI Settings']['Antenna 2 Gain']
-                self.dp1_sigmf_meta['captures'][0]['core:datetime'] = dt_min.isoformat().replace("+00:00","Z")
-                self.dp1_sigmf_meta['captures'][0]['core:frequency'] = self.metadata['RRI Settings']['Start Frequency A (Hz)']
-                self.dp1_sigmf_meta['global']['rri:bandwidth'] = self.metadata['RRI Settings']['Bandwidth A (kHz)'] * 1e3 #conv to Hz
-
-                #----DIPOLE 2-----------------------------
-                self.dp2_sigmf_meta['global']['rri:antenna_config'] = self.metadata['RRI Settings']['Antenna Configuration']
-                self.dp2_sigmf_meta['global']['rri:format'] = self.metadata['RRI Settings']['Data Format']
-                self.dp2_sigmf_meta['global']['rri:channel'] = "B"
-                self.dp2_sigmf_meta['global']['rri:antenna_3_gain'] = self.metadata['RRI Settings']['Antenna 3 Gain']
-                self.dp2_sigmf_meta['global']['rri:antenna_4_gain'] = self.metadata['RRI Settings']['Antenna 4 Gain']
-                self.dp2_sigmf_meta['captures'][0]['core:datetime'] = dt_min.isoformat().replace("+00:00","Z")
-                self.dp2_sigmf_meta['captures'][0]['core:frequency'] = self.metadata['RRI Settings']['Start Frequency B (Hz)']
-                self.dp2_sigmf_meta['global']['rri:bandwidth'] = self.metadata['RRI Settings']['Bandwidth B (kHz)'] * 1e3 #conv to Hz
-
-        if self.metadata['RRI Settings']['Antenna Configuration'] == 'Monopole':
-            if self.metadata['RRI Settings']['Data Format'] == "I1I2I3I4":
-                #----DIPOLE 1-----------------------------
-                self.dp1_sigmf_meta['global']['rri:antenna_config'] = self.metadata['RRI Settings']['Antenna Configuration']
-                self.dp1_sigmf_meta['global']['rri:format'] = self.metadata['RRI Settings']['Data Format']
-                self.dp1_sigmf_meta['global']['rri:channel'] = "A"
-                self.dp1_sigmf_meta['global']['rri:antenna_1_gain'] = self.metadata['RRI Settings']['Antenna 1 Gain']
-                self.dp1_sigmf_meta['global']['rri:antenna_2_gain'] = self.metadata['RRI Settings']['Antenna 2 Gain']
-                self.dp1_sigmf_meta['captures'][0]['core:datetime'] = dt_min.isoformat().replace("+00:00","Z")
-                self.dp1_sigmf_meta['captures'][0]['core:frequency'] = self.metadata['RRI Settings']['Start Frequency A (Hz)']
-                self.dp1_sigmf_meta['global']['rri:bandwidth'] = self.metadata['RRI Settings']['Bandwidth A (kHz)'] * 1e3 #conv to Hz
-
-                #----DIPOLE 2-----------------------------
-                self.dp2_sigmf_meta['global']['rri:antenna_config'] = self.metadata['RRI Settings']['Antenna Configuration']
-                self.dp2_sigmf_meta['global']['rri:format'] = self.metadata['RRI Settings']['Data Format']
-                self.dp2_sigmf_meta['global']['rri:channel'] = "B"
-                self.dp2_sigmf_meta['global']['rri:antenna_3_gain'] = self.metadata['RRI Settings']['Antenna 3 Gain']
-                self.dp2_sigmf_meta['global']['rri:antenna_4_gain'] = self.metadata['RRI Settings']['Antenna 4 Gain']
-                self.dp2_sigmf_meta['captures'][0]['core:datetime'] = dt_min.isoformat().replace("+00:00","Z")
-                self.dp2_sigmf_meta['captures'][0]['core:frequency'] = self.metadata['RRI Settings']['Start Frequency B (Hz)']
-                self.dp2_sigmf_meta['global']['rri:bandwidth'] = self.metadata['RRI Settings']['Bandwidth B (kHz)'] * 1e3 #conv to Hz
+        annots = None
+        if self.cfg['ephem_annotations']['enable']:
+            annots = self._gen_ephem_annotations()
 
+        self.sigmf_meta = {}
+        for stream in self.streams:
+            meta = copy.deepcopy(self.cfg['sigmf'])
+            capture = copy.deepcopy(self.cfg['sigmf']['captures'])
+            meta['global']['core:datatype'] = stream['datatype']
+            if self.quant is not None:
+                q = self.quant[stream['name']]
+                meta['global']['core:datatype'] = QUANT_DATATYPES[stream['datatype']]
+                meta['global']['rri:quant_scale'] = 1.0 / q['scale'] #mV per count
+                if q.get('rms_error') is not None:
+                    meta['global']['rri:quant_rms_error'] = float(q['rms_error'])
+                    meta['global']['rri:quant_max_error'] = q['max_err']
+                if q.get('sqnr_db') is not None:
+                    meta['global']['rri:quant_sqnr_db'] = float(q['sqnr_db'])
+            meta['global']['rri:antenna_config'] = settings['Antenna Configuration']
+            meta['global']['rri:format'] = settings['Data Format']
+            meta['global']['rri:channel'] = stream['name']
+            for ant in stream['gains']:
+                meta['global']['rri:antenna_{:d}_gain'.format(ant)] = settings['Antenna {:d} Gain'.format(ant)]
+            capture['core:datetime'] = dt_min.isoformat().replace("+00:00","Z")
+            capture['core:frequency'] = settings['Start Frequency {:s} (Hz)'.format(stream['band'])]
+            meta['global']['rri:bandwidth'] = settings['Bandwidth {:s} (kHz)'.format(stream['band'])] * 1e3 #conv to Hz
+            meta['captures'] = self._expand_captures(capture)
+            stream_annots = [] if annots is None else copy.deepcopy(annots)
+            if self.quality is not None:
+                ants = stream_antennas(stream)
+                meta['global'].update(self.quality.summary(ants))
+                stream_annots.extend(self.quality.annotations(ants))
+                stream_annots.sort(key=lambda annot: annot['core:sample_start'])
+            if annots is not None or self.quality is not None:
+                meta['annotations'] = stream_annots
+            self.sigmf_meta[stream['name']] = meta
 
-
-        if self.verbose:
-            print("--- DIPOLE 1 METADATA ----")
-            print(json.dumps(self.dp1_sigmf_meta, indent=4))
-            print("--------------------------")
-            print("--- DIPOLE 2 METADATA ----")
-            print(json.dumps(self.dp2_sigmf_meta, indent=4))
-            print("--------------------------")
+            if self.verbose:
+                print("--- CHANNEL {:s} METADATA ----".format(stream['name']))
+                print(json.dumps(meta, indent=4))
+                print("--------------------------")
 
         if self.export_meta:
-            if self.verbose:
-                print("Writing Metadata to file...")
-                print("Writing Channel A File: {:s}".format(self.sigmf_fps['A']['meta']))
-            with open(self.sigmf_fps['A']['meta'], 'w') as f:
-                f.write(json.dumps(self.dp1_sigmf_meta, indent=4))
-                f.close()
-            if self.verbose:
-                print("Writing Channel B File: {:s}".format(self.sigmf_fps['B']['meta']))
-            with open(self.sigmf_fps['B']['meta'], 'w') as f:
-                f.write(json.dumps(self.dp2_sigmf_meta, indent=4))
-                f.close()
+            if self.verbose: print("Writing Metadata to file...")
+            for name in self.stream_names:
+                if self.verbose:
+                    print("Writing Channel {:s} File: {:s}".format(name, self.sigmf_fps[name]['meta']))
+                with self.profiler.stage('write_meta'):
+                    with open(self.sigmf_fps[name]['meta'], 'w') as f:
+                        self.profiler.add_io('write_meta', written=f.write(json.dumps(self.sigmf_meta[name], indent=4)))
+                        f.close()
 
-    def _gen_sigmf_filename(self):
+    def output_files(self):
+        #Files written by this conversion, needs the streams from get_radio_iq
+        outputs = []
+        for name in sorted(self.stream_names):
+            if self.export_iq:
+                outputs.append(self.sigmf_fps[name]['data'])
+            if self.export_meta:
+                outputs.append(self.sigmf_fps[name]['meta'])
+        return outputs
 
-        self.sigmf_fps = {}
-        self.sigmf_fps['A'] = {}
-        self.sigmf_fps['B'] = {}
-
-        fn_rri = self.cfg['main']['rri_file']
-        fn_list = fn_rri.split("_")[0:4]
-        fn1_list = copy.copy(fn_list)
-        fn2_list = copy.copy(fn_list)
-        fn1_list.insert(1,"CHAN-A")
-        fn2_list.insert(1,"CHAN-B")
-        fn_dp1_meta = ".".join(["_".join(fn1_list), "sigmf-meta"])
-        fn_dp2_meta = ".".join(["_".join(fn2_list), "sigmf-meta"])
-        fn_dp1_data = ".".join(["_".join(fn1_list), "sigmf-data"])
-        fn_dp2_data = ".".join(["_".join(fn2_list), "sigmf-data"])
-
-        self.sigmf_fps['A']['meta'] = '/'.join([self.cfg['main']['rri_path'],fn_dp1_meta])
-        self.sigmf_fps['B']['meta'] = '/'.join([self.cfg['main']['rri_path'],fn_dp2_meta])
-        self.sigmf_fps['A']['data'] = '/'.join([self.cfg['main']['rri_path'],fn_dp1_data])
-        self.sigmf_fps['B']['data'] = '/'.join([self.cfg['main']['rri_path'],fn_dp2_data])
+    def get_profile(self):
+        #Stage profile report, written next to the SigMF files when profiling
+        #is enabled.  Returns None with profiling disabled.
+        if not self.profiler.enable:
+            return None
+        report = self.profiler.report()
+        fp = self.profiler.write_report(profile_filepath(self.cfg))
+        if self.verbose:
+            profile.print_report(report)
+            print("Wrote Stage Profile: {:s}".format(fp))
+        return report
+
+    def _gen_sigmf_filename(self):
+        self.sigmf_fps = gen_sigmf_filepaths(self.cfg, self.stream_names)
 
         if self.verbose:
             print("Generated SigMF Filepath Names:")
-            print(fn_dp1_meta, fn_dp2_meta)
-            print(fn_dp1_data, fn_dp2_data)
             print(json.dumps(self.sigmf_fps, indent=4))
+
+
+class HDF5_Lazy_Metadata(MutableMapping):
+    """
+    Read on access view of the HDF5 metadata tree.
+    Groups resolve to nested views and datasets are read through the
+    converter's _get_attr the first time they are accessed, then memoized.
+    Numeric arrays (ephemeris columns) are kept as numpy arrays, string
+    arrays are lists of str as in the eager tree.  At the top level only groups are visible and 'RRI Data' is hidden, matching the
+    eager _get_attrs_from_groups/_clean_attributes tree.
+    """
+    def __init__(self, conv, group, top=False):
+        self._conv  = conv
+        self._group = group
+        self._top   = top
+        self._memo  = {}
+        self._names = None
+
+    def _visible(self, name):
+        cls = self._group.get(name, getclass=True)
+        if self._top:
+            return cls is h5py.Group and "RRI Data" not in name
+        if cls is h5py.Dataset:
+            return h5py.check_ref_dtype(self._group[name].dtype) is None
+        return cls is h5py.Group
+
+    def _get_names(self):
+        if self._names is None:
+            self._names = [n for n in self._group.keys() if self._visible(n)]
+        return self._names
+
+    def __getitem__(self, key):
+        if key in self._memo:
+            return self._memo[key]
+        if key not in self._get_names():
+            raise KeyError(key)
+        obj = self._group[key]
+        if isinstance(obj, h5py.Group):
+            val = HDF5_Lazy_Metadata(self._conv, obj)
+        else:
+            val = self._conv._clean_value(self._conv._get_attr(self._group, key))
+        self._memo[key] = val
+        return val
+
+    def __setitem__(self, key, val):
+        if key not in self._get_names():
+            self._names.append(key)
+        self._memo[key] = val
+
+    def __delitem__(self, key):
+        if key not in self._get_names():
+            raise KeyError(key)
+        self._names.remove(key)
+        self._memo.pop(key, None)
+
+    def __iter__(self):
+        return iter(list(self._get_names()))
+
+    def __len__(self):
+        return len(self._get_names())
+
+    def __repr__(self):
+        #key names only, printing a view never reads its datasets
+        return "{:s}({:})".format(type(self).__name__, list(self))
+
+    def to_dict(self):
+        #Fully resolved plain dict copy of this node
+        out = {}
+        for key in self:
+            val = self[key]
+            if isinstance(val, HDF5_Lazy_Metadata):
+                val = val.to_dict()
+            out[key] = val
+        return out
+
+
+def find_packet_segments(pkt):
+    #Vectorized O(N) split of the packet number array into contiguous runs.
+    #Returns the start/stop row of each run and the elapsed packet count of
+    #every row relative to the first packet.  Non increasing steps (counter
+    #reset) are treated as contiguous since their gap cannot be recovered.
+    pkt = np.asarray(pkt, dtype=np.int64)
+    step = np.diff(pkt)
+    breaks = np.flatnonzero(step != 1) + 1
+    starts = np.concatenate(([0], breaks))
+    stops = np.concatenate((breaks, [len(pkt)]))
+    elapsed = np.zeros(len(pkt), dtype=np.int64)
+    np.cumsum(np.where(step > 0, step, 1), out=elapsed[1:])
+    return starts, stops, elapsed
+
+def utc_window(cfg):
+    #Configured UTC window as (start, stop) unix seconds, None for open ends
+    win = cfg['main']['window']
+    start = ephem.parse_utc(win['start']) if win['start'] else None
+    stop = ephem.parse_utc(win['stop']) if win['stop'] else None
+    if start is not None and stop is not None and stop <= start:
+        print("WARNING: UTC window stop is not after start: {:} to {:}".format(win['start'], win['stop']))
+        sys.exit()
+    return start, stop
+
+def utc_isoformat(utc):
+    return datetime.datetime.fromtimestamp(utc, tz=pytz.UTC).isoformat().replace("+00:00","Z")
+
+def gen_sigmf_filepaths(cfg, streams=CHANNELS, window=True):
+    #SigMF meta/data filepaths for each output stream (channel A and B by
+    #default), derived from the RRI filename.  With a UTC window the date,
+    #start and stop fields are replaced by the window's.
+    sigmf_fps = {}
+    fn_list = cfg['main']['rri_file'].split("_")[0:4]
+    start, stop = utc_window(cfg) if window else (None, None)
+    if start is not None:
+        t = datetime.datetime.fromtimestamp(start, tz=pytz.UTC)
+        fn_list[1:3] = [t.strftime("%Y%m%d"), t.strftime("%H%M%S")]
+    if stop is not None:
+        fn_list[3] = datetime.datetime.fromtimestamp(stop, tz=pytz.UTC).strftime("%H%M%S")
+    for name in streams:
+        fn_chan = copy.copy(fn_list)
+        fn_chan.insert(1, "CHAN-{:s}".format(name))
+        sigmf_fps[name] = {}
+        sigmf_fps[name]['meta'] = '/'.join([cfg['main']['rri_path'], ".".join(["_".join(fn_chan), "sigmf-meta"])])
+        sigmf_fps[name]['data'] = '/'.join([cfg['main']['rri_path'], ".".join(["_".join(fn_chan), "sigmf-data"])])
+    return sigmf_fps
+
+def h5_file_options(cfg):
+    #h5py.File keyword arguments for the raw data chunk cache and file driver
+    opts = {
+        'rdcc_nbytes': int(cfg['h5']['rdcc_nbytes']),
+        'rdcc_nslots': int(cfg['h5']['rdcc_nslots']),
+        'rdcc_w0'    : float(cfg['h5']['rdcc_w0']),
+    }
+    if cfg['h5']['driver']:
+        opts['driver'] = cfg['h5']['driver']
+    return opts
+
+def profile_filepath(cfg):
+    #Stage profile report filepath, derived from the RRI filename
+    fn = "_".join(cfg['main']['rri_file'].split("_")[0:4] + ["profile"])
+    return '/'.join([cfg['main']['rri_path'], ".".join([fn, "json"])])
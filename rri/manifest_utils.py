@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+'''
+  Title: RRI Conversion Manifest
+Project: ePOP RRI to GNU Radio
+   Date: Oct 2026
+   Desc: Records the identity (size, mtime, content hash) of the inputs and
+         the configuration used for each output product so reruns over an
+         archive can skip products that are already current.
+ Author: Zach Leffke, KJ4QLP
+'''
+import sys, os
+import json
+import hashlib
+
+MANIFEST_VERSION = 1
+HASH_BLOCK_SIZE = 1 << 22
+
+
+def file_sha256(fp):
+    h = hashlib.sha256()
+    with open(fp, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def file_identity(fp, use_hash=True):
+    #size, mtime and (optionally) content hash of an input file
+    st = os.stat(fp)
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns,
+            'sha256': file_sha256(fp) if use_hash else None}
+
+def config_hash(cfg_subset):
+    #Stable hash of the configuration values that affect a product
+    s = json.dumps(cfg_subset, sort_keys=True, default=str)
+    return hashlib.sha256(s.encode('utf-8')).hexdigest()
+
+def product_config(cfg, product):
+    #Configuration sections that change the content of each output product
+    if product == 'sigmf':
+        return {'sigmf'     : cfg['sigmf'],
+                'mono_to_di': cfg['main']['mono_to_di'],
+                'window'    : cfg['main']['window'],
+                'quantize'  : cfg['main']['quantize'],
+                'quality'   : cfg['quality'],
+                'ephem_annotations': cfg['ephem_annotations'],
+                'export'    : cfg['main']['export']}
+    if product == 'stk':
+        return {'stk': cfg['stk']}
+    if product == 'snr':
+        return {'snr': cfg['snr']}
+    raise KeyError("Unknown manifest product: {:}".format(product))
+
+def manifest_filepath(cfg):
+    fp = cfg['manifest']['file']
+    if not os.path.isabs(fp):
+        fp = '/'.join([cfg['main']['rri_path'], fp])
+    return fp
+
+
+class Conversion_Manifest(object):
+    """
+    JSON manifest of converted products, keyed by product name and primary
+    input file.  Each record holds the size, mtime and sha256 of every input,
+    the hash of the product configuration and the list of output files.
+    An input's sha256 is computed once per size/mtime and shared by the
+    records of every product that reads it.
+    """
+    def __init__(self, fp, use_hash=True, verbose=False):
+        self.fp = fp
+        self.use_hash = use_hash
+        self.verbose = verbose
+        self.records = {}
+        self.identities = {} #input file -> last identity with a hash
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.fp):
+            return
+        try:
+            with open(self.fp, 'r') as f:
+                data = json.load(f)
+                f.close()
+        except ValueError:
+            print("WARNING: Unreadable manifest, starting a new one: {:s}".format(self.fp))
+            return
+        if data.get('version') != MANIFEST_VERSION:
+            print("WARNING: Manifest version mismatch, starting a new one: {:s}".format(self.fp))
+            return
+        self.records = data['products']
+        for rec in self.records.values():
+            for fp, ident in rec['inputs'].items():
+                self._remember(fp, ident)
+
+    def _remember(self, fp, ident):
+        if ident.get('sha256') is not None:
+            self.identities[fp] = ident
+
+    def save(self):
+        #write to a temp file first so an interrupted run never leaves a
+        #truncated manifest behind
+        tmp = self.fp + '.tmp'
+        with open(tmp, 'w') as f:
+            f.write(json.dumps({'version': MANIFEST_VERSION, 'products': self.records}, indent=4))
+            f.close()
+        os.replace(tmp, self.fp)
+
+    def _key(self, product, inputs):
+        return ':'.join([product, os.path.abspath(inputs[0])])
+
+    def _identity(self, fp, known=()):
+        #size and mtime are checked first, the content hash is reused from a
+        #known identity (this product's record, one passed in, or any other
+        #product's record of the same file) and only computed when none
+        #matches
+        st = os.stat(fp)
+        ident = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': None}
+        for k in list(known) + [self.identities.get(fp)]:
+            if (k is not None and k['sha256'] is not None and
+                k['size'] == ident['size'] and k['mtime_ns'] == ident['mtime_ns']):
+                ident['sha256'] = k['sha256']
+                break
+        else:
+            if self.use_hash:
+                ident['sha256'] = file_sha256(fp)
+        self._remember(fp, ident)
+        return ident
+
+    def _input_changed(self, fp, known):
+        if known is None or not os.path.exists(fp):
+            return True
+        st = os.stat(fp)
+        if st.st_size != known['size']:
+            return True
+        if st.st_mtime_ns == known['mtime_ns']:
+            return False
+        #touched but possibly not modified, fall back to the content hash
+        if not self.use_hash or known['sha256'] is None:
+            return True
+        if file_sha256(fp) != known['sha256']:
+            return True
+        known['mtime_ns'] = st.st_mtime_ns
+        return False
+
+    def is_current(self, product, inputs, outputs, cfg_subset):
+        #True when the product was built from identical inputs with the same
+        #configuration and all of its output files still exist.  With outputs
+        #None the outputs recorded in the manifest are checked, for products
+        #whose output files depend on the input contents.
+        rec = self.records.get(self._key(product, inputs))
+        if rec is None:
+            return False
+        if rec['config'] != config_hash(cfg_subset):
+            if self.verbose: print("Manifest: {:s} configuration changed".format(product))
+            return False
+        if outputs is None:
+            outputs = rec['outputs']
+        elif sorted(rec['outputs']) != sorted(os.path.abspath(fp) for fp in outputs):
+            return False
+        for fp in outputs:
+            if not os.path.exists(fp):
+                if self.verbose: print("Manifest: missing output {:s}".format(fp))
+                return False
+        for fp in inputs:
+            if self._input_changed(fp, rec['inputs'].get(os.path.abspath(fp))):
+                if self.verbose: print("Manifest: input changed {:s}".format(fp))
+                return False
+        return True
+
+    def update(self, product, inputs, outputs, cfg_subset, known=None):
+        #known: {input file: identity} already computed elsewhere (a worker
+        #process), used while the file's size and mtime still match
+        known = {} if known is None else {os.path.abspath(fp): k for fp, k in known.items()}
+        key = self._key(product, inputs)
+        old = self.records.get(key, {'inputs': {}})
+        rec = {
+            'inputs' : {},
+            'config' : config_hash(cfg_subset),
+            'outputs': [os.path.abspath(fp) for fp in outputs],
+        }
+        for fp in inputs:
+            fp = os.path.abspath(fp)
+            rec['inputs'][fp] = self._identity(fp, [old['inputs'].get(fp), known.get(fp)])
+        self.records[key] = rec
+
+def open_manifest(cfg):
+    #Returns the configured manifest, or None when manifests are disabled
+    if not cfg['manifest']['enable']:
+        return None
+    return Conversion_Manifest(manifest_filepath(cfg),
+                               use_hash=cfg['manifest']['hash'],
+                               verbose=cfg['main']['verbose'])
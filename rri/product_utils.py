@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+'''
+  Title: RRI Product Conversions
+Project: ePOP RRI to GNU Radio
+   Date: Oct 2026
+   Desc: The SigMF, STK and SNR conversions of a single RRI file as
+         callable functions, shared by the rri command, the rri_to_sigmf,
+         rri_to_stk and rri_snr_convert scripts and the conversion daemon.
+ Author: Zach Leffke, KJ4QLP
+'''
+import sys, os
+import json
+
+import hdf5_utils as utils
+import batch_utils as batch
+import concat_utils as concat
+import manifest_utils as mfst
+import stk_utils as stk
+import snr_utils as snr
+import table_utils as table
+import psd_utils as psd
+
+#in dependency order, an 'iq' SNR estimate reads the SigMF data
+PRODUCTS = ['sigmf', 'stk', 'snr']
+PRODUCT_NAMES = {'sigmf': 'SigMF', 'stk': 'STK', 'snr': 'SNR'}
+
+
+def rri_filepath(cfg):
+    return '/'.join([cfg['main']['rri_path'], cfg['main']['rri_file']])
+
+def file_base(cfg):
+    #RRI_<date>_<start>_<stop> of the RRI filename
+    return "_".join(cfg['main']['rri_file'].split("_")[0:4])
+
+def stk_table_filepath(cfg):
+    if cfg['stk']['table'] == 'none':
+        return None
+    return table.table_filepath('/'.join([cfg['main']['rri_path'], file_base(cfg) + "_EPHEM"]),
+                                cfg['stk']['table'])
+
+def snr_filepaths(cfg):
+    #SNR input files of channel A/B
+    if cfg['snr']['source'] == 'iq':
+        #estimate SNR from the channel A/B sigmf-data written by rri_to_sigmf
+        sigmf_fps = utils.gen_sigmf_filepaths(cfg, window=False)
+        return sigmf_fps['A']['data'], sigmf_fps['B']['data']
+    return ("/".join([cfg['main']['rri_path'], cfg['snr']['file_a']]),
+            "/".join([cfg['main']['rri_path'], cfg['snr']['file_b']]))
+
+def snr_datatypes(cfg):
+    #quantized recordings are ci16_le, the datatype is taken from the meta
+    sigmf_fps = utils.gen_sigmf_filepaths(cfg, window=False)
+    datatypes = {}
+    for chan in ['A', 'B']:
+        datatypes[chan] = 'cf32_le'
+        fp = sigmf_fps[chan]['meta']
+        if os.path.exists(fp):
+            with open(fp, 'r') as f:
+                datatypes[chan] = json.load(f)['global']['core:datatype']
+                f.close()
+    return datatypes
+
+def snr_output_filepath(cfg):
+    return table.table_filepath("/".join([cfg['main']['rri_path'], file_base(cfg) + "_SNR"]),
+                                cfg['snr']['format'])
+
+def product_inputs(cfg, product):
+    #Manifest inputs of a product, the RRI file first
+    if product == 'snr':
+        return [rri_filepath(cfg)] + list(snr_filepaths(cfg))
+    return [rri_filepath(cfg)]
+
+def product_outputs(cfg, product):
+    #Output files of a product, None for the SigMF files which depend on the
+    #RRI Settings (the outputs recorded in the manifest are checked)
+    if product == 'sigmf':
+        return None
+    if product == 'stk':
+        outputs = []
+        if cfg['stk']['export']:
+            outputs += list(stk.gen_STK_filepaths(cfg['main']['rri_path'], file_base(cfg)))
+        if cfg['stk']['table'] != 'none':
+            outputs.append(stk_table_filepath(cfg))
+        return outputs
+    if product == 'snr':
+        return [snr_output_filepath(cfg)]
+    raise KeyError("Unknown product: {:}".format(product))
+
+def is_current(cfg, product, manifest):
+    #True when the manifest records the product as current for its inputs
+    inputs = product_inputs(cfg, product)
+    if not all(os.path.exists(fp) for fp in inputs):
+        return False
+    return manifest.is_current(product, inputs, product_outputs(cfg, product),
+                               mfst.product_config(cfg, product))
+
+def run_sigmf(cfg):
+    conv = utils.HDF5_SigMF_Converter(cfg)
+    try:
+        conv.get_metadata()
+        conv.get_radio_iq()
+        conv.get_radio_meta()
+        conv.get_profile()
+    finally:
+        if conv.h5_data is not None:
+            conv.h5_data.close()
+    return conv.output_files()
+
+def run_stk(cfg):
+    conv = utils.HDF5_SigMF_Converter(cfg)
+    metadata = conv.get_metadata()
+
+    eph = conv.get_ephemeris()
+    df = eph.to_dataframe(['Ephemeris UTC [sec]',
+                           'Geographic Latitude (deg)',
+                           'Geographic Longitude (deg)',
+                           'Altitude (km)',
+                           'Roll (deg)',
+                           'Pitch (deg)',
+                           'Yaw (deg)'])
+    df.name = file_base(cfg)
+    print(df)
+    if cfg['main']['verbose']: print(list(metadata['CASSIOPE Ephemeris'].keys()))
+
+    if cfg['stk']['export']:
+        tol_m, tol_deg = None, None
+        if cfg['stk']['decimate']['enable']:
+            tol_m   = cfg['stk']['decimate']['pos_tol_m']
+            tol_deg = cfg['stk']['decimate']['att_tol_deg']
+        stk.export_STK_ephemeris(df, cfg['main']['rri_path'], tol_m)
+        stk.export_STK_attitude(df, cfg['main']['rri_path'], tol_deg)
+    tbl_fp = stk_table_filepath(cfg)
+    if tbl_fp is not None:
+        print("Ephemeris Table:", tbl_fp)
+        table.export_table(tbl_fp, df, cfg['stk']['table'], cfg['stk']['compression'])
+    if conv.h5_data is not None:
+        conv.h5_data.close()
+    return product_outputs(cfg, 'stk')
+
+def run_snr(cfg):
+    fp_a, fp_b = snr_filepaths(cfg)
+    o_fp = snr_output_filepath(cfg)
+
+    conv = utils.HDF5_SigMF_Converter(cfg)
+    conv.get_metadata()
+
+    eph = conv.get_ephemeris()
+    ScenarioStart = eph.start
+    ScenarioEnd   = eph.stop
+    ScenarioLength = ScenarioEnd - ScenarioStart
+    print(ScenarioStart, ScenarioEnd)
+    print(ScenarioLength)
+    if conv.h5_data is not None:
+        conv.h5_data.close()
+
+    print(fp_a)
+    print(fp_b)
+
+    if not os.path.exists(fp_a) == True:
+        print('  ERROR: RRI SNR file or path does not exist: {:s}'.format(fp_a))
+        sys.exit()
+    else: print("Found SNR File A: {:s}".format(fp_a))
+    if not os.path.exists(fp_b) == True:
+        print('  ERROR: RRI SNR file or path does not exist: {:s}'.format(fp_b))
+        sys.exit()
+    else: print("Found SNR File B: {:s}".format(fp_b))
+
+    samp_rate = cfg['snr']['samp_rate']
+    if cfg['snr']['source'] == 'iq':
+        psd_cfg = cfg['snr']['psd']
+        datatypes = snr_datatypes(cfg)
+        snr_a, snr_b = [psd.estimate_snr(fp, cfg['sigmf']['global']['core:samp_rate'], samp_rate,
+                                         psd_cfg['nfft'], psd_cfg['overlap'], psd_cfg['signal_bw'],
+                                         psd_cfg['workers'], psd_cfg['block_outputs'], datatypes[chan],
+                                         psd_cfg['win_len'])
+                        for chan, fp in [('A', fp_a), ('B', fp_b)]]
+    else:
+        #memory mapped, the files are only paged in as each chunk is written
+        snr_a = snr.load_snr_file(fp_a, cfg['snr']['skip'])
+        snr_b = snr.load_snr_file(fp_b, cfg['snr']['skip'])
+
+    print(len(snr_a)/samp_rate)
+    print(len(snr_b)/samp_rate)
+    num_rows = min(len(snr_a), len(snr_b))
+    print(num_rows, len(snr_a), len(snr_b))
+
+    print(o_fp)
+    snr.export_snr_table(o_fp, ScenarioStart, samp_rate, snr_a, snr_b,
+                         cfg['snr']['format'], cfg['snr']['compression'], cfg['snr']['chunk_rows'])
+    return [o_fp]
+
+RUNNERS = {'sigmf': run_sigmf, 'stk': run_stk, 'snr': run_snr}
+
+def run_product(cfg, product, manifest=None):
+    #Convert one product of the configured RRI file, skipped when the
+    #manifest has it current.  Returns the output files, None if skipped.
+    if product_outputs(cfg, product) == []:
+        #nothing is written, nothing to track
+        manifest = None
+    if manifest is not None and is_current(cfg, product, manifest):
+        print("{:s} outputs are current, skipping: {:s}".format(PRODUCT_NAMES[product], rri_filepath(cfg)))
+        manifest.save()
+        return None
+    outputs = RUNNERS[product](cfg)
+    if manifest is not None:
+        manifest.update(product, product_inputs(cfg, product), outputs, mfst.product_config(cfg, product))
+        manifest.save()
+    return outputs
+
+def convert_sigmf(cfg):
+    #SigMF conversion as configured, a concatenation, a batch or the single
+    #configured file
+    if cfg['concat']['enable']:
+        files = batch.find_rri_files(cfg['concat']['input'])
+        if len(files) == 0:
+            print('ERROR: No RRI files found for concat input: {:s}'.format(cfg['concat']['input']))
+            sys.exit()
+        return concat.concat_passes(cfg, files)
+
+    if cfg['batch']['enable']:
+        files = batch.find_rri_files(cfg['batch']['input'])
+        if len(files) == 0:
+            print('ERROR: No RRI files found for batch input: {:s}'.format(cfg['batch']['input']))
+            sys.exit()
+        print("Batch converting {:d} files with {:d} workers".format(len(files), cfg['batch']['workers']))
+        manifest = mfst.open_manifest(cfg)
+        if manifest is not None:
+            files = batch.filter_current(cfg, files, manifest)
+            manifest.save()
+        results, elapsed = batch.run_batch(cfg, files, cfg['batch']['workers'])
+        if manifest is not None:
+            batch.update_manifest(cfg, results, manifest)
+            manifest.save()
+        batch.print_batch_summary(results, elapsed)
+        if cfg['main']['profile']['enable']:
+            batch.write_batch_profile(cfg, results)
+        return [fp for res in results for fp in res['outputs']]
+
+    return run_product(cfg, 'sigmf', mfst.open_manifest(cfg))
+
+def file_info(cfg):
+    #Summary of the configured RRI file and the manifest status of its
+    #products.  Only metadata is read (from the metadata cache when it is
+    #current), never the radio data.
+    cfg['main']['verbose'] = False
+    fp = rri_filepath(cfg)
+    conv = utils.HDF5_SigMF_Converter(cfg)
+    metadata = conv.get_metadata()
+    eph = conv.get_ephemeris()
+    settings = {key: metadata['RRI Settings'][key] for key in metadata['RRI Settings'].keys()}
+    if conv.h5_data is not None:
+        conv.h5_data.close()
+    streams = utils.demux_streams(settings, cfg['main']['mono_to_di'])
+
+    manifest = mfst.open_manifest(cfg)
+    products = {}
+    for product in PRODUCTS:
+        if manifest is None:
+            products[product] = 'unknown'
+        else:
+            products[product] = 'current' if is_current(cfg, product, manifest) else 'stale'
+    return {
+        'file'            : fp,
+        'bytes'           : os.path.getsize(fp),
+        'start'           : utils.utc_isoformat(eph.start),
+        'stop'            : utils.utc_isoformat(eph.stop),
+        'duration_sec'    : float(eph.stop - eph.start),
+        'ephemeris_points': len(eph),
+        'settings'        : settings,
+        'streams'         : None if streams is None else [stream['name'] for stream in streams],
+        'products'        : products,
+    }
+
+def print_info(info):
+    rows = [('File'          , info['file']),
+            ('Size [MB]'     , "{:.2f}".format(info['bytes'] / 1e6)),
+            ('Start [UTC]'   , info['start']),
+            ('Stop [UTC]'    , info['stop']),
+            ('Duration [sec]', "{:.3f}".format(info['duration_sec'])),
+            ('Ephemeris'     , "{:d} points".format(info['ephemeris_points'])),
+            ('Streams'       , "unsupported" if info['streams'] is None else ", ".join(info['streams']))]
+    for label, val in rows:
+        print("{:>14s}: {:s}".format(label, val))
+    print("---- RRI Settings---------")
+    for key in sorted(info['settings'].keys()):
+        print("  {:s}: {:}".format(key, info['settings'][key]))
+    print("---- Products (manifest)---------")
+    for product in PRODUCTS:
+        print("  {:5s}: {:s}".format(PRODUCT_NAMES[product], info['products'][product]))
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+'''
+  Title: RRI Conversion Profiling
+Project: ePOP RRI to GNU Radio
+   Date: Oct 2026
+   Desc: Opt-in per stage instrumentation (wall time, bytes read/written,
+         peak memory) with a JSON report per file and aggregation over
+         many reports.
+ Author: Zach Leffke, KJ4QLP
+'''
+import sys, os
+import json
+import time
+import resource
+import threading
+import contextlib
+import tracemalloc
+
+
+PAGE_SIZE = resource.getpagesize()
+
+def _rss_hwm_mb():
+    #process lifetime high water mark, ru_maxrss is in kB on linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+def _rss_mb():
+    #current resident set size (linux only), None elsewhere
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            pages = int(f.read().split()[1])
+            f.close()
+        return pages * PAGE_SIZE / 1048576.0
+    except (IOError, OSError, IndexError, ValueError):
+        return None
+
+def _proc_io():
+    #bytes read/written by this process (linux only), None elsewhere
+    try:
+        with open('/proc/self/io', 'r') as f:
+            vals = dict(line.split(':') for line in f.read().strip().split('\n'))
+            f.close()
+        return int(vals['rchar']), int(vals['wchar'])
+    except (IOError, OSError, KeyError, ValueError):
+        return None
+
+
+class Stage_Profiler(object):
+    """
+    Records wall time, bytes read/written and memory per named stage.  A
+    stage may be entered many times (per block, per channel thread), its
+    time, byte counts and RSS deltas are summed and its traced memory peaks
+    are maxed.  rss_delta_mb is the change of the current RSS across the
+    stage, hwm_growth_mb how far the stage raised the process RSS high water
+    mark (zero once an earlier stage set a higher one).  With enable=False
+    every call is a no-op.
+    """
+    def __init__(self, name, enable=True, trace_memory=False):
+        self.name = name
+        self.enable = enable
+        self.trace_memory = enable and trace_memory
+        self.stages = {}
+        self.order = []
+        self.lock = threading.Lock()
+        self.open_peaks = {}
+        self.t_start = time.perf_counter()
+        self.io_start = _proc_io() if enable else None
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def _entry(self, name):
+        if name not in self.stages:
+            self.order.append(name)
+            self.stages[name] = {'calls': 0, 'wall_sec': 0.0, 'bytes_read': 0, 'bytes_written': 0,
+                                 'rss_delta_mb': 0.0, 'hwm_growth_mb': 0.0, 'traced_peak_mb': None}
+        return self.stages[name]
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        if not self.enable:
+            yield
+            return
+        peak = [0]
+        if self.trace_memory:
+            with self.lock:
+                self._fold_peak()
+                tracemalloc.reset_peak()
+                self.open_peaks[id(peak)] = peak
+        rss0, hwm0 = _rss_mb(), _rss_hwm_mb()
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            dt = time.perf_counter() - t0
+            with self.lock:
+                entry = self._entry(name)
+                entry['calls'] += 1
+                entry['wall_sec'] += dt
+                rss1 = _rss_mb()
+                if rss0 is not None and rss1 is not None:
+                    entry['rss_delta_mb'] += rss1 - rss0
+                entry['hwm_growth_mb'] += _rss_hwm_mb() - hwm0
+                if self.trace_memory:
+                    self._fold_peak()
+                    del self.open_peaks[id(peak)]
+                    entry['traced_peak_mb'] = max(entry['traced_peak_mb'] or 0.0, peak[0] / 1e6)
+
+    def _fold_peak(self):
+        #the tracemalloc peak is global, fold it into every open stage before
+        #a nested stage resets it
+        traced = tracemalloc.get_traced_memory()[1]
+        for peak in self.open_peaks.values():
+            peak[0] = max(peak[0], traced)
+
+    def add_io(self, name, read=0, written=0):
+        if not self.enable:
+            return
+        with self.lock:
+            entry = self._entry(name)
+            entry['bytes_read'] += int(read)
+            entry['bytes_written'] += int(written)
+
+    def report(self):
+        rep = {
+            'file'       : self.name,
+            'wall_sec'   : time.perf_counter() - self.t_start,
+            'process_rss_hwm_mb': _rss_hwm_mb(),
+            'stages'     : [dict(stage=name, **self.stages[name]) for name in self.order],
+        }
+        io_now = _proc_io()
+        if self.io_start is not None and io_now is not None:
+            rep['proc_bytes_read'] = io_now[0] - self.io_start[0]
+            rep['proc_bytes_written'] = io_now[1] - self.io_start[1]
+        return rep
+
+    def write_report(self, fp):
+        with open(fp, 'w') as f:
+            f.write(json.dumps(self.report(), indent=4))
+            f.close()
+        return fp
+
+
+def aggregate_reports(reports):
+    #Sum time, bytes and RSS deltas per stage over many per file reports,
+    #the process high water mark is the max over all files
+    agg = {'files': len(reports), 'wall_sec': 0.0, 'process_rss_hwm_mb': 0.0, 'stages': {}}
+    order = []
+    for rep in reports:
+        agg['wall_sec'] += rep['wall_sec']
+        agg['process_rss_hwm_mb'] = max(agg['process_rss_hwm_mb'], rep['process_rss_hwm_mb'])
+        for st in rep['stages']:
+            if st['stage'] not in agg['stages']:
+                order.append(st['stage'])
+                agg['stages'][st['stage']] = {'calls': 0, 'wall_sec': 0.0, 'bytes_read': 0,
+                                              'bytes_written': 0, 'rss_delta_mb': 0.0, 'hwm_growth_mb': 0.0}
+            a = agg['stages'][st['stage']]
+            a['calls'] += st['calls']
+            a['wall_sec'] += st['wall_sec']
+            a['bytes_read'] += st['bytes_read']
+            a['bytes_written'] += st['bytes_written']
+            a['rss_delta_mb'] += st['rss_delta_mb']
+            a['hwm_growth_mb'] += st['hwm_growth_mb']
+    agg['stages'] = [dict(stage=name, **agg['stages'][name]) for name in order]
+    return agg
+
+def print_report(rep):
+    print("----------Stage Profile----------------------------")
+    print("{:>16s} {:>6s} {:>10s} {:>12s} {:>12s} {:>10s} {:>10s}".format("stage", "calls", "wall [s]",
+                                                                         "read [MB]", "write [MB]",
+                                                                         "dRSS [MB]", "dHWM [MB]"))
+    for st in rep['stages']:
+        print("{:>16s} {:6d} {:10.3f} {:12.2f} {:12.2f} {:10.1f} {:10.1f}".format(
+            st['stage'], st['calls'], st['wall_sec'], st['bytes_read']/1e6, st['bytes_written']/1e6,
+            st['rss_delta_mb'], st['hwm_growth_mb']))
+    print("{:>16s} {:6s} {:10.3f} {:>12s} {:>12s} {:>10s} {:10.1f}".format("total", "", rep['wall_sec'], "", "",
+                                                                          "HWM", rep['process_rss_hwm_mb']))
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+'''
+  Title: RRI PSD/SNR Estimator
+Project: ePOP RRI to GNU Radio
+   Date: Oct 2026
+   Desc: Block-wise Welch PSD and SNR estimate straight from the channel
+         sigmf-data (cf32_le or ci16_le) written by HDF5_SigMF_Converter.
+         Real rf32_le streams (monopole data with mono_to_di False) are not
+         supported, the estimate needs complex IQ.  The IQ file
+         is memory mapped and blocks of SNR outputs are spread over a
+         process pool, so memory is bounded by the block size.
+ Author: Zach Leffke, KJ4QLP
+'''
+import sys, os
+import functools
+import multiprocessing
+import numpy as np
+
+
+#bytes per complex sample of the supported SigMF datatypes
+SAMPLE_BYTES = {'cf32_le': 8, 'ci16_le': 4}
+#Welch segments below which the estimate is close to a single periodogram
+MIN_SEGMENTS = 3
+
+def _check_datatype(datatype):
+    if datatype in SAMPLE_BYTES:
+        return
+    if datatype.startswith('r'):
+        raise ValueError("Real {:} streams are not supported for the SNR estimate, it needs complex IQ "
+                         "(main mono_to_di True or dipole data)".format(datatype))
+    raise ValueError("Unsupported SigMF datatype for SNR estimate: {:}".format(datatype))
+
+def _open_iq(data_fp, datatype):
+    #memory mapped samples, ci16_le as (n, 2) int16 I/Q pairs
+    _check_datatype(datatype)
+    if datatype == 'cf32_le':
+        return np.memmap(data_fp, dtype=np.csingle, mode='r')
+    return np.memmap(data_fp, dtype=np.int16, mode='r').reshape(-1, 2)
+
+def snr_output_count(num_samps, samp_rate, snr_rate):
+    #SNR outputs whose first sample lies inside the recording
+    hop = samp_rate / snr_rate
+    return int(np.ceil(num_samps / hop)) if num_samps > 0 else 0
+
+def _window_len(samp_rate, snr_rate, nfft, win_len):
+    #samples per estimate, at least one output hop and one FFT
+    hop = samp_rate / snr_rate
+    return max(nfft, int(round(hop)), int(win_len or 0))
+
+def _segment_offsets(win_len, nfft, overlap):
+    step = max(1, int(round(nfft * (1.0 - overlap))))
+    return np.arange(0, win_len - nfft + 1, step)
+
+def _snr_block(data_fp, datatype, samp_rate, snr_rate, nfft, overlap, signal_bw, win_len, out_range):
+    #SNR [dB] for outputs [out_range[0], out_range[1]), run in a pool worker
+    iq = _open_iq(data_fp, datatype)
+    n = len(iq)
+    hop = samp_rate / snr_rate
+    win_len = _window_len(samp_rate, snr_rate, nfft, win_len)
+    seg_offsets = _segment_offsets(win_len, nfft, overlap)
+
+    k = np.arange(out_range[0], out_range[1])
+    #windows longer than the hop are centered on the output's hop interval
+    starts = np.round(k * hop - (win_len - hop) / 2.0).astype(np.int64)
+    #sample index of every (output, segment, bin), samples outside the file
+    #are zero
+    idx = starts[:,None,None] + seg_offsets[None,:,None] + np.arange(nfft)[None,None,:]
+    valid = (idx >= 0) & (idx < n)
+    x = np.asarray(iq[np.clip(idx, 0, n - 1)])
+    if datatype == 'ci16_le':
+        #the SNR is a power ratio, the quantization scale cancels
+        x = (x[...,0] + 1j * x[...,1]).astype(np.csingle)
+    x[~valid] = 0
+    window = np.hanning(nfft).astype(np.single)
+    psd = np.abs(np.fft.fft(x * window, axis=-1))**2
+    psd = np.fft.fftshift(psd.mean(axis=1), axes=-1)
+
+    freqs = np.fft.fftshift(np.fft.fftfreq(nfft, 1.0/samp_rate))
+    in_band = np.abs(freqs) <= signal_bw / 2.0
+    if in_band.all() or not in_band.any():
+        raise ValueError("signal_bw must select some but not all of the {:d} FFT bins".format(nfft))
+    sig = psd[:, in_band].max(axis=1)
+    noise = np.median(psd[:, ~in_band], axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        snr = 10.0 * np.log10(sig / noise)
+    return snr.astype(np.single)
+
+def estimate_snr(data_fp, samp_rate, snr_rate, nfft=64, overlap=0.5, signal_bw=1000.0,
+                 workers=1, block_outputs=4096, datatype='cf32_le', win_len=None):
+    #SNR time series at snr_rate from a cf32_le (or ci16_le) file.  Output k
+    #is the Welch PSD of the win_len samples centered on the hop interval
+    #starting at sample k*samp_rate/snr_rate (one hop when win_len is None),
+    #signal is the peak bin within +/-signal_bw/2 of center, noise the median
+    #of the remaining bins.
+    _check_datatype(datatype)
+    segs = len(_segment_offsets(_window_len(samp_rate, snr_rate, nfft, win_len), nfft, overlap))
+    if segs < MIN_SEGMENTS:
+        print("WARNING: SNR estimate window averages {:d} Welch segment(s) of {:d} bins, "
+              "use a win_len of at least {:d} samples".format(segs, nfft, 2 * nfft))
+    num_samps = os.path.getsize(data_fp) // SAMPLE_BYTES[datatype]
+    num_out = snr_output_count(num_samps, samp_rate, snr_rate)
+    ranges = [(i, min(i + block_outputs, num_out)) for i in range(0, num_out, block_outputs)]
+    worker = functools.partial(_snr_block, data_fp, datatype, samp_rate, snr_rate, nfft, overlap, signal_bw,
+                               win_len)
+    if len(ranges) == 0:
+        return np.zeros(0, dtype=np.single)
+    if workers <= 1 or len(ranges) == 1:
+        blocks = [worker(r) for r in ranges]
+    else:
+        with multiprocessing.Pool(processes=min(workers, len(ranges))) as pool:
+            blocks = pool.map(worker, ranges)
+    return np.concatenate(blocks)
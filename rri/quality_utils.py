@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+'''
+  Title: RRI Data Quality Statistics
+Project: ePOP RRI to GNU Radio
+   Date: Oct 2026
+   Desc: Per packet NaN, clipping, RMS and DC offset statistics of the four
+         RRI monopole datasets, taken on the blocks the converter already
+         reads, with the bad packet regions as SigMF annotations and a per
+         antenna summary for the SigMF global metadata.
+ Author: Zach Leffke, KJ4QLP
+'''
+import sys, os
+import numpy as np
+
+SAMPS_PER_PACKET = 29
+NUM_ANTENNAS = 4
+#annotation label of each bad packet condition
+FLAG_LABELS = ['nan', 'clip', 'dc']
+
+
+class Packet_Quality(object):
+    """
+    Per packet statistics of the packet rows [row_start:row_stop] of the four
+    monopole datasets, one value per antenna and packet.  update() is called
+    with every block read, before the NaNs are zeroed, and zeroes them.  A
+    row that is read again (quantization peak pass) is overwritten.
+    """
+    def __init__(self, cfg, row_start, row_stop):
+        self.cfg = cfg
+        self.row_start = row_start
+        self.num_rows = row_stop - row_start
+        self.clip_mv = float(cfg['clip_mv'])
+        self.max_dc_mv = float(cfg['max_dc_mv'])
+        shape = (NUM_ANTENNAS, self.num_rows)
+        self.nan_count = np.zeros(shape, dtype=np.uint8)
+        self.clip_count = np.zeros(shape, dtype=np.uint8)
+        self.rms = np.zeros(shape, dtype=np.single)
+        self.dc = np.zeros(shape, dtype=np.single)
+
+    def update(self, start, rd):
+        #rd: the four (rows, 29) blocks of packet rows starting at row start
+        i = start - self.row_start
+        for k, buf in enumerate(rd):
+            j = i + len(buf)
+            #the per packet NaN and clip counts are only taken for blocks
+            #that have any, clean blocks cost one block wide check each
+            nan = np.isnan(buf)
+            if nan.any():
+                buf[nan] = 0
+                self.nan_count[k, i:j] = nan.sum(axis=1)
+                valid = SAMPS_PER_PACKET - self.nan_count[k, i:j].astype(np.single)
+                valid[valid == 0] = np.nan #all NaN packet, no RMS/DC
+            else:
+                self.nan_count[k, i:j] = 0
+                valid = np.single(SAMPS_PER_PACKET)
+            self.dc[k, i:j] = buf.sum(axis=1) / valid
+            self.rms[k, i:j] = np.sqrt(np.einsum('ij,ij->i', buf, buf) / valid)
+            self.clip_count[k, i:j] = 0
+            if self.clip_mv > 0 and len(buf) > 0 and max(buf.max(), -buf.min()) >= self.clip_mv:
+                self.clip_count[k, i:j] = (np.abs(buf) >= self.clip_mv).sum(axis=1)
+
+    def flags(self, ants):
+        #bool (conditions, rows) of the bad packets of the antennas (1-4)
+        k = [ant - 1 for ant in ants]
+        flags = np.zeros((len(FLAG_LABELS), self.num_rows), dtype=bool)
+        flags[0] = self.nan_count[k].any(axis=0)
+        flags[1] = self.clip_count[k].any(axis=0)
+        if self.max_dc_mv > 0:
+            flags[2] = (np.abs(self.dc[k]) > self.max_dc_mv).any(axis=0)
+        return flags
+
+    def regions(self, ants):
+        #(start, stop) packet rows of the runs of bad packets, runs closer
+        #than merge_packets are joined
+        bad = self.flags(ants).any(axis=0)
+        edges = np.diff(np.concatenate(([0], bad.view(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1)
+        stops = np.flatnonzero(edges == -1)
+        if len(starts) > 1:
+            keep = np.ones(len(starts), dtype=bool)
+            keep[1:] = starts[1:] - stops[:-1] > int(self.cfg['merge_packets'])
+            starts = starts[keep]
+            stops = stops[np.append(keep[1:], True)]
+        return starts, stops
+
+    def annotations(self, ants):
+        #SigMF annotations of the bad packet regions, sample indices of the
+        #recording (row_start is sample 0)
+        flags = self.flags(ants)
+        k = [ant - 1 for ant in ants]
+        starts, stops = self.regions(ants)
+        limit = int(self.cfg['max_annotations'])
+        if len(starts) > limit:
+            print("WARNING: {:d} bad packet regions, annotating the first {:d}".format(len(starts), limit))
+            starts, stops = starts[:limit], stops[:limit]
+        annots = []
+        for start, stop in zip(starts, stops):
+            labels = [FLAG_LABELS[c] for c in range(len(FLAG_LABELS)) if flags[c, start:stop].any()]
+            annots.append({
+                'core:sample_start'  : int(start) * SAMPS_PER_PACKET,
+                'core:sample_count'  : int(stop - start) * SAMPS_PER_PACKET,
+                'core:label'         : ','.join(labels),
+                'rri:bad_packets'    : int(flags[:, start:stop].any(axis=0).sum()),
+                'rri:nan_samples'    : int(self.nan_count[k, start:stop].sum()),
+                'rri:clipped_samples': int(self.clip_count[k, start:stop].sum()),
+                'rri:max_dc_offset'  : float(np.nan_to_num(np.abs(self.dc[k, start:stop])).max()),
+            })
+        return annots
+
+    def summary(self, ants):
+        #SigMF global keys of the whole recording, per antenna RMS and DC
+        #offset over the valid samples and the NaN/clipped sample counts
+        glob = {}
+        starts, stops = self.regions(ants)
+        bad = self.flags(ants).any(axis=0)
+        glob['rri:bad_packets'] = int(bad.sum())
+        glob['rri:bad_regions'] = int(len(starts))
+        for ant in ants:
+            k = ant - 1
+            valid = SAMPS_PER_PACKET - self.nan_count[k].astype(np.float64)
+            num = valid.sum()
+            ok = valid > 0
+            dc = np.dot(self.dc[k][ok], valid[ok]) / num if num > 0 else 0.0
+            rms = np.sqrt(np.dot(np.square(self.rms[k][ok], dtype=np.float64), valid[ok]) / num) if num > 0 else 0.0
+            glob['rri:antenna_{:d}_nan_samples'.format(ant)] = int(self.nan_count[k].sum())
+            glob['rri:antenna_{:d}_clipped_samples'.format(ant)] = int(self.clip_count[k].sum())
+            glob['rri:antenna_{:d}_rms'.format(ant)] = float(rms)
+            glob['rri:antenna_{:d}_dc_offset'.format(ant)] = float(dc)
+        return glob
+
+    def report(self, name, ants):
+        glob = self.summary(ants)
+        print("Channel {:s}: {:d} of {:d} packets bad in {:d} regions".format(name, glob['rri:bad_packets'],
+                                                                             self.num_rows,
+                                                                             glob['rri:bad_regions']))
+        for ant in ants:
+            print("  Antenna {:d}: RMS {:.3f} mV, DC {:.3f} mV, NaN {:d}, clipped {:d}".format(
+                ant, glob['rri:antenna_{:d}_rms'.format(ant)], glob['rri:antenna_{:d}_dc_offset'.format(ant)],
+                glob['rri:antenna_{:d}_nan_samples'.format(ant)],
+                glob['rri:antenna_{:d}_clipped_samples'.format(ant)]))
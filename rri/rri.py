@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+'''
+  Title: RRI Command Line
+Project: ePOP RRI to GNU Radio
+   Date: Oct 2026
+   Desc: Single entry point for the RRI conversions:
+           rri.py sigmf   RRI HDF5 to SigMF (single file, --batch or --concat)
+           rri.py stk     CASSIOPE ephemeris/attitude to STK
+           rri.py snr     SNR time series table
+           rri.py info    RRI file summary and product status
+           rri.py daemon  watch a landing directory and convert new files
+         Only argparse and the configuration loader are imported at startup,
+         each subcommand imports the modules it needs (numpy, h5py, pandas)
+         when it runs.
+  Input: Level 1 RRI Data, HDF5 Format
+ Output: SigMF Record, STK ephemeris/attitude, SNR table
+ Author: Zach Leffke
+
+RRI Data From:
+https://epop.phys.ucalgary.ca/data/
+'''
+import sys, os
+import argparse
+import warnings
+warnings.filterwarnings("ignore")
+
+import config_utils as config
+
+
+def cmd_sigmf(cfg, args):
+    import product_utils as prod
+    config.apply_sigmf_args(cfg, args)
+    prod.convert_sigmf(cfg)
+
+def cmd_stk(cfg, args):
+    import manifest_utils as mfst
+    import product_utils as prod
+    prod.run_product(cfg, 'stk', mfst.open_manifest(cfg))
+
+def cmd_snr(cfg, args):
+    import manifest_utils as mfst
+    import product_utils as prod
+    prod.run_product(cfg, 'snr', mfst.open_manifest(cfg))
+
+def cmd_info(cfg, args):
+    import json
+    import batch_utils as batch
+    import product_utils as prod
+    if args.file is not None:
+        cfg = batch.file_config(cfg, args.file)
+    info = prod.file_info(cfg)
+    if args.json:
+        print(json.dumps(info, indent=4, default=str))
+    else:
+        prod.print_info(info)
+
+def cmd_daemon(cfg, args):
+    import daemon_utils as daemon
+    config.apply_daemon_args(cfg, args)
+    status = daemon.Conversion_Daemon(cfg).run(args.max_files, args.idle_exit)
+    print("Daemon stopped: {:}".format(status['counters']))
+
+COMMANDS = {
+    'sigmf' : cmd_sigmf,
+    'stk'   : cmd_stk,
+    'snr'   : cmd_snr,
+    'info'  : cmd_info,
+    'daemon': cmd_daemon,
+}
+
+def build_parser():
+    fmt = argparse.ArgumentDefaultsHelpFormatter
+    parser = argparse.ArgumentParser(description="ePOP RRI Conversions", formatter_class=fmt)
+    common = argparse.ArgumentParser(add_help=False)
+    config.add_config_args(common)
+    sub = parser.add_subparsers(dest='command', metavar='command')
+    sub.required = True
+
+    p = sub.add_parser('sigmf', parents=[common], formatter_class=fmt, help="RRI HDF5 to SigMF recordings")
+    config.add_sigmf_args(p)
+    sub.add_parser('stk', parents=[common], formatter_class=fmt, help="CASSIOPE ephemeris/attitude to STK")
+    sub.add_parser('snr', parents=[common], formatter_class=fmt, help="SNR time series table")
+    p = sub.add_parser('info', parents=[common], formatter_class=fmt, help="RRI file summary and product status")
+    p.add_argument("file", nargs="?", type=str, default=None, help="RRI HDF5 file, overrides config")
+    p.add_argument("--json", dest = "json", action = "store_true", help = "Print the summary as JSON")
+    p = sub.add_parser('daemon', parents=[common], formatter_class=fmt, help="Watch a directory and convert new RRI files")
+    config.add_daemon_args(p)
+    return parser
+
+if __name__ == '__main__':
+    #--------START Command Line option parser------------------------------------------------------
+    args = build_parser().parse_args()
+    #--------END Command Line option parser------------------------------------------------------
+    #--Import and Parse Configuration File, info output stays machine readable
+    cfg = config.import_configs_yaml(args, verbose=args.command != 'info')
+    COMMANDS[args.command](cfg, args)
+    sys.exit()
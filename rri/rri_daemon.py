@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+'''
+  Title: RRI Conversion Daemon
+Project: ePOP RRI to GNU Radio
+   Date: Oct 2026
+   Desc: Watches a landing directory for new RRI HDF5 files and converts
+         each one to the configured products (SigMF, STK, SNR) in a pool of
+         long lived worker processes.  Queue depth, latency and counters
+         are kept in a status JSON file next to the incoming files.
+  Input: Level 1 RRI Data, HDF5 Format, as files arrive
+ Output: SigMF Record, STK ephemeris/attitude, SNR table per file
+ Author: Zach Leffke
+
+RRI Data From:
+https://epop.phys.ucalgary.ca/data/
+'''
+import sys, os
+import argparse
+import warnings
+warnings.filterwarnings("ignore")
+
+import config_utils as config
+import daemon_utils as daemon
+
+if __name__ == '__main__':
+    #--------START Command Line option parser------------------------------------------------------
+    parser = argparse.ArgumentParser(description="RRI Conversion Daemon",
+                                     formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    config.add_config_args(parser)
+    config.add_daemon_args(parser)
+
+    args = parser.parse_args()
+    #--------END Command Line option parser------------------------------------------------------
+    #--Import and Parse Configuration File
+    cfg = config.import_configs_yaml(args)
+    config.apply_daemon_args(cfg, args)
+
+    d = daemon.Conversion_Daemon(cfg)
+    status = d.run(args.max_files, args.idle_exit)
+    print("Daemon stopped: {:}".format(status['counters']))
+    sys.exit()
@@ -14,81 +14,31 @@ https://gist.github.com/ssomnath/e3cb824b76d6837ea0f95054e6189574
 RRI Data From:
 https://epop.phys.ucalgary.ca/data/
 '''
-import sys, os, copy
+import sys, os
 import argparse
 import warnings
-from datetime import datetime as dt
-from datetime import timedelta
-import pandas as pd
-import numpy as np
-import json
-import yaml
-import h5py
 warnings.filterwarnings("ignore")
 
-import hdf5_utils as utils
+import config_utils as config
+import product_utils as prod
 
 
-def import_configs_yaml(args):
-    ''' setup configuration data '''
-    fp_cfg = '/'.join([args.cfg_path,args.cfg_file])
-    #print (fp_cfg)
-    if not os.path.isfile(fp_cfg) == True:
-        print('ERROR: Invalid Configuration File: {:s}'.format(fp_cfg))
-        sys.exit()
-    print('Importing configuration File: {:s}'.format(fp_cfg))
-    with open(fp_cfg, 'r') as yaml_file:
-        cfg = yaml.safe_load(yaml_file)
-        yaml_file.close()
-
-    if cfg['main']['base_path'] == 'cwd':
-        cfg['main']['base_path'] = os.getcwd()
-    return cfg
-
 if __name__ == '__main__':
     #--------START Command Line option parser------------------------------------------------------
     parser = argparse.ArgumentParser(description="RRI to SigMF",
                                      formatter_class=argparse.ArgumentDefaultsHelpFormatter)
-
-    cwd = os.getcwd()
-    cfg_fp_default = '/'.join([cwd, 'config'])
-    cfg = parser.add_argument_group('Configuration File')
-    cfg.add_argument('--cfg_path',
-                       dest='cfg_path',
-                       type=str,
-                       default=cfg_fp_default,
-                       help="Configuration File Path",
-                       action="store")
-    cfg.add_argument('--cfg_file',
-                       dest='cfg_file',
-                       type=str,
-                       default="config.yaml",
-                       help="Configuration File",
-                       action="store")
+    config.add_config_args(parser)
 
     parser.add_argument("-s", dest = "save_fig", action = "store", type = int, default=0 , help = "Save Data, 0=No, 1=Yes")
+    config.add_sigmf_args(parser)
 
     args = parser.parse_args()
     #--------END Command Line option parser------------------------------------------------------
-    os.system('reset')
     #--Import and Parse Configuration File
-    cfg = import_configs_yaml(args)
-    #print(cfg)
-    #rri=utils.import_h5(cfg)
-    #print(list(rri.keys()))
-    #print(rri.keys())
-
-    #conv = utils.HDF5_SigMF_Converter(rri)
-
-    conv = utils.HDF5_SigMF_Converter(cfg)
-    metadata = conv.get_metadata()
-    #print(json.dumps(metadata, indent=4))
-
-    # conv._gen_sigmf_filename(verbose=True)
-    # conv._gen_sigmf_meta(verbose=True)
-    conv.get_radio_iq()
-    conv.get_radio_meta()
+    cfg = config.import_configs_yaml(args)
 
+    config.apply_sigmf_args(cfg, args)
+    prod.convert_sigmf(cfg)
     sys.exit()
 
     conv._radio_meta(cfg)
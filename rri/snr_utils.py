@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+'''
+  Title: RRI SNR Utilities
+Project: ePOP RRI to GNU Radio
+   Date: Oct 2026
+   Desc: Memory mapped SNR input and chunked, timestamped SNR output
+         (CSV, Parquet, Feather or HDF5 through table_utils)
+ Author: Zach Leffke, KJ4QLP
+'''
+import sys, os
+import numpy as np
+
+import table_utils as table
+
+SNR_COLUMNS = ['Ephemeris UTC [sec]', 'Dipole A SNR [dB]', 'Dipole B SNR [dB]']
+
+
+def load_snr_file(fp, skip=0):
+    #Memory map a float32 SNR file, skipping the first skip values
+    offset = skip * np.dtype(np.single).itemsize
+    if os.path.getsize(fp) <= offset:
+        return np.zeros(0, dtype=np.single)
+    return np.memmap(fp, dtype=np.single, mode='r', offset=offset)
+
+def snr_timestamps(start, samp_rate, start_idx, stop_idx):
+    #UTC seconds of SNR samples [start_idx, stop_idx), same arithmetic as
+    #start + i*(1.0/samp_rate) for every i
+    return start + np.arange(start_idx, stop_idx, dtype=np.float64) * (1.0/samp_rate)
+
+def iter_snr_chunks(start, samp_rate, snr_a, snr_b, chunk_rows):
+    #DataFrame chunks of the SNR time series, indexed by SNR sample number
+    import pandas as pd
+    num_rows = min(len(snr_a), len(snr_b))
+    for i in range(0, num_rows, chunk_rows):
+        j = min(i + chunk_rows, num_rows)
+        df = pd.DataFrame({SNR_COLUMNS[0]: snr_timestamps(start, samp_rate, i, j),
+                           SNR_COLUMNS[1]: np.asarray(snr_a[i:j]),
+                           SNR_COLUMNS[2]: np.asarray(snr_b[i:j])},
+                          index=pd.RangeIndex(i, j))
+        yield df
+
+def export_snr_table(o_fp, start, samp_rate, snr_a, snr_b, fmt='csv', compression=True, chunk_rows=1000000):
+    #Chunked writer, only one chunk of timestamps/rows is in memory at a time
+    chunks = iter_snr_chunks(start, samp_rate, snr_a, snr_b, chunk_rows)
+    return table.export_table(o_fp, chunks, fmt, compression)
@@ -14,50 +14,167 @@ import sys
 import csv
 import os
 
-import pandas as pd
 import numpy as np
 import datetime
 import pytz
 
-def export_STK_ephemeris(df, o_path):
+def gen_STK_filepaths(o_path, name):
+    #--Ephemeris and Attitude filepaths for a dataframe name--
+    return o_path+'/'+name+'.e', o_path+'/'+name+'.a'
+
+#time offset [sec] and data column formats for the STK record lines
+STK_TIME_FMT = '%.6f'
+STK_DATA_FMT = '%.12g'
+STK_BLOCK_ROWS = 65536
+#width reserved for the point count when it is only known after streaming
+STK_COUNT_WIDTH = 12
+
+EPHEMERIS_COLUMNS = ['Geographic Latitude (deg)','Geographic Longitude (deg)','Altitude (km)']
+ATTITUDE_COLUMNS  = ['Yaw (deg)','Pitch (deg)','Roll (deg)']
+
+def export_STK_ephemeris(df, o_path, tol_m=None):
     #--Exports single dataframe--
     #df    :  dataframe to export
     #o_path:  output path to FOLDER, need to append filename derived df name
-    o_path += '/'+df.name+'.e'
+    #tol_m :  optional decimation tolerance, max position error [m]
+    o_path = gen_STK_filepaths(o_path, df.name)[0]
     print("Ephemeris:", o_path)
+    epoch, block = _df_to_STK_block(df, EPHEMERIS_COLUMNS)
+    if tol_m is not None:
+        keep = decimate_track(block[:,0], block[:,1:], _lla_error_m, tol_m)
+        print("  Decimated {:d} -> {:d} points (tol {:g} m)".format(len(block), int(keep.sum()), tol_m))
+        block = block[keep]
+    write_STK_ephemeris(o_path, epoch, [block], len(block))
 
-    epoch = datetime.datetime.fromtimestamp(df['Ephemeris UTC [sec]'][0], tz=pytz.UTC)
+def export_STK_attitude(df, o_path, tol_deg=None):
+    #--Exports single dataframe--
+    #df     :  dataframe to export
+    #o_path :  output path to FOLDER, need to append filename derived df name
+    #tol_deg:  optional decimation tolerance, max angle error [deg]
+    o_path = gen_STK_filepaths(o_path, df.name)[1]
+    print("Attitude:", o_path)
+    epoch, block = _df_to_STK_block(df, ATTITUDE_COLUMNS)
+    if tol_deg is not None:
+        keep = decimate_track(block[:,0], block[:,1:], _angle_error_deg, tol_deg)
+        print("  Decimated {:d} -> {:d} points (tol {:g} deg)".format(len(block), int(keep.sum()), tol_deg))
+        block = block[keep]
+    write_STK_attitude(o_path, epoch, [block], len(block))
 
-    stk_header = _generate_STK_ephemeris_header(len(df), epoch)
-    #print stk_header
-    with open(o_path, 'w') as of:
-        of.write(stk_header)
-        of.close()
+#WGS84, for the ephemeris decimation error
+WGS84_A  = 6378137.0
+WGS84_E2 = 6.69437999014e-3
 
-    header = ['Geographic Latitude (deg)','Geographic Longitude (deg)','Altitude (km)']
-    df.to_csv(o_path, sep=' ', columns=header, header=False, mode='a')
-    with open(o_path, 'a') as of:
-        of.write('END Ephemeris')
-        of.close()
+def lla_to_ecef(lat, lon, alt_km):
+    #--Geodetic lat/lon [deg], altitude [km] to ECEF [m]--
+    lat = np.deg2rad(lat)
+    lon = np.deg2rad(lon)
+    alt = np.asarray(alt_km) * 1e3
+    n = WGS84_A / np.sqrt(1.0 - WGS84_E2 * np.sin(lat)**2)
+    x = (n + alt) * np.cos(lat) * np.cos(lon)
+    y = (n + alt) * np.cos(lat) * np.sin(lon)
+    z = (n * (1.0 - WGS84_E2) + alt) * np.sin(lat)
+    return np.stack([x, y, z], axis=-1)
 
-def export_STK_attitude(df, o_path):
-    #--Exports single dataframe--
-    #df    :  dataframe to export
-    #o_path:  output path to FOLDER, need to append filename derived df name
-    o_path += '/'+df.name+'.a'
-    print("Attitude:", o_path)
-    epoch = datetime.datetime.fromtimestamp(df['Ephemeris UTC [sec]'][0], tz=pytz.UTC)
-    stk_header = _generate_STK_attitude_header(len(df), epoch)
-    #print stk_header
-    with open(o_path, 'w') as of:
-        of.write(stk_header)
-        of.close()
+def _lla_error_m(true, interp):
+    #--Distance [m] between true and interpolated lat/lon/alt rows--
+    d = lla_to_ecef(*true.T) - lla_to_ecef(*interp.T)
+    return np.sqrt((d**2).sum(axis=1))
+
+def _angle_error_deg(true, interp):
+    #--Largest wrapped angle difference [deg] over the columns of each row--
+    d = np.mod(true - interp + 180.0, 360.0) - 180.0
+    return np.abs(d).max(axis=1)
+
+def decimate_track(t, values, err_func, tol):
+    #--Error bounded decimation for linear (Lagrange order 1) interpolation--
+    #Start from the end points and repeatedly add, in every segment that is
+    #out of tolerance, the point with the largest error.  Each pass is
+    #vectorized over the whole track.  Returns a boolean keep mask.
+    t = np.asarray(t, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    n = len(t)
+    keep = np.zeros(n, dtype=bool)
+    if n <= 2:
+        keep[:] = True
+        return keep
+    keep[0] = keep[-1] = True
+    pts = np.arange(n)
+    while True:
+        idx = np.flatnonzero(keep)
+        interp = np.empty_like(values)
+        for j in range(values.shape[1]):
+            interp[:,j] = np.interp(t, t[idx], values[idx,j])
+        err = err_func(values, interp)
+        err[keep] = 0.0
+        err = np.where(err > tol, err, -1.0)
+        if not (err > 0).any():
+            break
+        #largest error of each segment [idx[k], idx[k+1])
+        seg = np.searchsorted(idx[:-1], pts, side='right') - 1
+        seg_max = np.maximum.reduceat(err, idx[:-1])
+        keep |= (err > 0) & (err == seg_max[seg])
+    return keep
 
-    header = ['Yaw (deg)','Pitch (deg)','Roll (deg)']
-    df.to_csv(o_path, sep=' ', columns=header, header=False, mode='a')
-    with open(o_path, 'a') as of:
-        of.write('END Attitude')
+def _df_to_STK_block(df, columns):
+    #--[time offset from ScenarioEpoch, columns...] as one float64 array--
+    utc = np.asarray(df['Ephemeris UTC [sec]'], dtype=np.float64)
+    epoch = datetime.datetime.fromtimestamp(utc[0], tz=pytz.UTC)
+    block = np.empty((len(utc), len(columns)+1), dtype=np.float64)
+    block[:,0] = utc - utc[0]
+    for i, col in enumerate(columns):
+        block[:,i+1] = df[col]
+    return epoch, block
+
+def write_STK_ephemeris(o_path, epoch, blocks, num_points=None):
+    #--Streams ephemeris records to an STK .e file--
+    #blocks    : iterable of arrays (or single rows) [time offset, lat, lon, alt]
+    #num_points: point count for the header, None to count while streaming
+    return _write_STK_records(o_path, _generate_STK_ephemeris_header, epoch,
+                              blocks, num_points, 'END Ephemeris')
+
+def write_STK_attitude(o_path, epoch, blocks, num_points=None):
+    #--Streams attitude records to an STK .a file--
+    #blocks    : iterable of arrays (or single rows) [time offset, yaw, pitch, roll]
+    #num_points: point count for the header, None to count while streaming
+    return _write_STK_records(o_path, _generate_STK_attitude_header, epoch,
+                              blocks, num_points, 'END Attitude')
+
+def _write_STK_records(o_path, header_func, epoch, blocks, num_points, trailer):
+    #--Header, records and trailer in one buffered pass over a single open file--
+    patch = num_points is None
+    header = header_func(0 if patch else num_points, epoch)
+    if patch:
+        #reserve a fixed width field and seek back to fill it in at the end
+        count_line = [l for l in header.split('\n') if l.startswith('Number')][0]
+        count_pos = header.index(count_line) + len(count_line) - 1
+        header = header.replace(count_line, count_line[:-1] + ' '*STK_COUNT_WIDTH)
+    count = 0
+    with open(o_path, 'w', buffering=1<<20) as of:
+        if patch:
+            of.write(header[:count_pos])
+            header = header[count_pos:]
+            count_pos = of.tell()
+        of.write(header)
+        for block in blocks:
+            block = np.atleast_2d(np.asarray(block, dtype=np.float64))
+            for i in range(0, len(block), STK_BLOCK_ROWS):
+                of.write(_format_STK_block(block[i:i+STK_BLOCK_ROWS]))
+            count += len(block)
+        of.write(trailer)
+        if patch:
+            of.seek(count_pos)
+            of.write('{:<{w}d}'.format(count, w=STK_COUNT_WIDTH))
         of.close()
+    if not patch and count != num_points:
+        print("WARNING: {:s} header has {:d} points, wrote {:d}".format(o_path, num_points, count))
+    return count
+
+def _format_STK_block(block):
+    #--One string formatting call for the whole block, no per row python loop--
+    if len(block) == 0:
+        return ''
+    row_fmt = ' '.join([STK_TIME_FMT] + [STK_DATA_FMT]*(block.shape[1]-1)) + '\n'
+    return (row_fmt * len(block)) % tuple(block.ravel().tolist())
 
 def _generate_STK_attitude_header(num_points, epoch):
     header = ''
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+'''
+  Title: RRI Table Output Utilities
+Project: ePOP RRI to GNU Radio
+   Date: Oct 2026
+   Desc: Columnar table writers/readers for the SNR time series and the
+         ephemeris/attitude table.  CSV and HDF5 (h5py) are always
+         available, Parquet and Feather need pyarrow.
+ Author: Zach Leffke, KJ4QLP
+'''
+import sys, os
+import numpy as np
+
+TABLE_EXTENSIONS = {
+    'csv'    : 'csv',
+    'parquet': 'parquet',
+    'feather': 'feather',
+    'hdf5'   : 'hdf5', #not .h5, keeps tables out of RRI *.h5 globs
+}
+ARROW_CODEC = 'zstd'
+HDF5_CODEC = 'gzip'
+HDF5_LEVEL = 4
+
+
+def table_filepath(o_base, fmt):
+    if fmt not in TABLE_EXTENSIONS:
+        raise ValueError("Unknown table format: {:}, expected one of {:}".format(fmt, list(TABLE_EXTENSIONS.keys())))
+    return '.'.join([o_base, TABLE_EXTENSIONS[fmt]])
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        import pyarrow.ipc
+    except ImportError:
+        raise ImportError("Parquet and Feather output need pyarrow (pip install pyarrow)")
+    return pyarrow
+
+def export_table(o_fp, chunks, fmt, compression=True):
+    #Write an iterable of DataFrame chunks (same columns) to o_fp, chunks are
+    #appended as they arrive so only one chunk is held in memory.  Returns
+    #the number of rows written.
+    import pandas as pd
+    if isinstance(chunks, pd.DataFrame):
+        chunks = [chunks]
+    if fmt == 'csv':
+        return _export_csv(o_fp, chunks)
+    if fmt == 'hdf5':
+        return _export_hdf5(o_fp, chunks, compression)
+    if fmt in ['parquet', 'feather']:
+        return _export_arrow(o_fp, chunks, fmt, compression)
+    raise ValueError("Unknown table format: {:}".format(fmt))
+
+def _export_csv(o_fp, chunks):
+    num_rows = 0
+    with open(o_fp, 'w') as f:
+        for df in chunks:
+            df.to_csv(f, header=(num_rows == 0))
+            num_rows += len(df)
+        f.close()
+    return num_rows
+
+def _export_hdf5(o_fp, chunks, compression):
+    import h5py
+    num_rows = 0
+    with h5py.File(o_fp, 'w') as h5:
+        for df in chunks:
+            if num_rows == 0:
+                h5.attrs['columns'] = list(df.columns)
+                for col in df.columns:
+                    h5.create_dataset(col, data=df[col].values, maxshape=(None,),
+                                      chunks=True,
+                                      compression=HDF5_CODEC if compression else None,
+                                      compression_opts=HDF5_LEVEL if compression else None,
+                                      shuffle=bool(compression))
+            else:
+                for col in df.columns:
+                    ds = h5[col]
+                    ds.resize((num_rows + len(df),))
+                    ds[num_rows:] = df[col].values
+            num_rows += len(df)
+    return num_rows
+
+def _export_arrow(o_fp, chunks, fmt, compression):
+    pa = _import_pyarrow()
+    codec = ARROW_CODEC if compression else None
+    writer = None
+    num_rows = 0
+    try:
+        for df in chunks:
+            batch = pa.Table.from_pandas(df, preserve_index=False)
+            if writer is None:
+                if fmt == 'parquet':
+                    writer = pa.parquet.ParquetWriter(o_fp, batch.schema, compression=codec or 'none')
+                else:
+                    #Feather v2 is the Arrow IPC file format
+                    opts = pa.ipc.IpcWriteOptions(compression=codec)
+                    writer = pa.ipc.new_file(o_fp, batch.schema, options=opts)
+            writer.write_table(batch)
+            num_rows += len(df)
+    finally:
+        if writer is not None:
+            writer.close()
+    return num_rows
+
+def import_table(fp):
+    #Read any table written by export_table back into a DataFrame
+    import pandas as pd
+    ext = fp.rsplit('.', 1)[-1]
+    if ext == 'csv':
+        return pd.read_csv(fp, index_col=0)
+    if ext == 'hdf5':
+        import h5py
+        with h5py.File(fp, 'r') as h5:
+            return pd.DataFrame({col: h5[col][:] for col in h5.attrs['columns']})
+    if ext == 'parquet':
+        pa = _import_pyarrow()
+        return pa.parquet.read_table(fp).to_pandas()
+    if ext == 'feather':
+        pa = _import_pyarrow()
+        return pa.ipc.open_file(fp).read_all().to_pandas()
+    raise ValueError("Unknown table file extension: {:s}".format(fp))